@@ -44,6 +44,10 @@ pyinstaller --clean ^
 REM Create dist directory if it doesn't exist
 if not exist "dist" mkdir dist
 
+REM Bundle wheels for the core requirements so the installer works offline
+pip wheel -r requirements-core.txt -w "dist\wheels"
+copy "requirements-core.txt" "dist\" 2>nul
+
 REM Copy additional files
 if not exist "dist\docs" mkdir dist\docs
 copy "docs\SIMPLE_USER_GUIDE.md" "dist\docs\" 2>nul
@@ -1,5 +1,9 @@
+import functools
 import os
+import time
+from collections import defaultdict
 from pathlib import Path
+from string import Template
 import json
 import yaml
 from typing import Dict, List, Optional, Any
@@ -7,6 +11,12 @@ import logging
 from datetime import datetime
 import shutil
 
+# Prefer the libyaml-backed dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -14,12 +24,51 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@functools.lru_cache(maxsize=1)
+def _today_iso(day: tuple) -> str:
+    return datetime(*day).strftime('%Y-%m-%d')
+
+def today_iso() -> str:
+    """Return today's local date as YYYY-MM-DD, formatted once per day."""
+    return _today_iso(time.localtime()[:3])
+
+_DOC_HEADER = Template("# $title\n\nLast Updated: $date\n\n")
+_VERSIONED_DOC_HEADER = Template("# $title\n\nVersion: $version\nLast Updated: $date\n\n")
+
+def _render_list(items: List[Any]) -> str:
+    return "".join(f"- {item}\n" for item in items)
+
+def _render_subdict(items: Dict[str, Any]) -> str:
+    return "".join(f"### {key}\n\n{value}\n\n" for key, value in items.items())
+
+# Section bodies are either bullet lists or sub-headed dicts; any other
+# value renders as an empty section
+_RENDERERS = {list: _render_list, dict: _render_subdict}
+
+def _render_sections(sections: Dict[str, Any]) -> str:
+    """Render the `## section` blocks shared by the guide-style documents."""
+    parts = []
+    for section, content in sections.items():
+        parts.append(f"## {section}\n\n")
+        render = _RENDERERS.get(type(content))
+        if render is not None:
+            parts.append(render(content))
+        parts.append("\n")
+    return "".join(parts)
+
 class DocumentationGenerator:
     def __init__(self, output_dir: str = "docs"):
         self.output_dir = Path(output_dir)
         self.templates_dir = Path("docs/templates")
-        self.ensure_directories()
-        
+        self._created_dirs = set()
+
+    def _ensure_dir(self, directory: Path) -> Path:
+        """Create a directory on first use, skipping repeat mkdir calls."""
+        if directory not in self._created_dirs:
+            directory.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(directory)
+        return directory
+
     def ensure_directories(self):
         """Ensure all required directories exist."""
         directories = [
@@ -36,22 +85,21 @@ class DocumentationGenerator:
         ]
         
         for directory in directories:
-            directory.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(directory)
     
     def generate_user_guide(self, title: str, content: Dict[str, Any], version: str = "1.0"):
         """Generate a user guide document."""
         try:
             # Create guide directory
             guide_dir = self.output_dir / "user_guides" / title.lower().replace(" ", "_")
-            guide_dir.mkdir(exist_ok=True)
+            self._ensure_dir(guide_dir)
             
             # Generate markdown content
             markdown = self._generate_markdown(title, content, version)
             
             # Save guide
             guide_path = guide_dir / "README.md"
-            with open(guide_path, 'w') as f:
-                f.write(markdown)
+            guide_path.write_text(markdown, encoding='utf-8')
             
             logger.info(f"Generated user guide: {title}")
             return True
@@ -64,23 +112,24 @@ class DocumentationGenerator:
         try:
             # Create API docs directory
             api_dir = self.output_dir / "api" / f"v{version}"
-            api_dir.mkdir(parents=True, exist_ok=True)
+            self._ensure_dir(api_dir)
             
             # Generate OpenAPI specification
             openapi_spec = self._generate_openapi_spec(endpoints, version)
             
             # Save specification
             spec_path = api_dir / "openapi.yaml"
-            with open(spec_path, 'w') as f:
-                yaml.dump(openapi_spec, f, default_flow_style=False)
+            spec_path.write_text(
+                yaml.dump(openapi_spec, Dumper=_YamlDumper, default_flow_style=False),
+                encoding='utf-8'
+            )
             
             # Generate markdown documentation
             markdown = self._generate_api_markdown(endpoints, version)
             
             # Save documentation
             docs_path = api_dir / "README.md"
-            with open(docs_path, 'w') as f:
-                f.write(markdown)
+            docs_path.write_text(markdown, encoding='utf-8')
             
             logger.info(f"Generated API documentation v{version}")
             return True
@@ -93,15 +142,14 @@ class DocumentationGenerator:
         try:
             # Create troubleshooting directory
             troubleshooting_dir = self.output_dir / "troubleshooting"
-            troubleshooting_dir.mkdir(exist_ok=True)
+            self._ensure_dir(troubleshooting_dir)
             
             # Generate markdown content
             markdown = self._generate_troubleshooting_markdown(issues)
             
             # Save guide
             guide_path = troubleshooting_dir / "README.md"
-            with open(guide_path, 'w') as f:
-                f.write(markdown)
+            guide_path.write_text(markdown, encoding='utf-8')
             
             logger.info("Generated troubleshooting guide")
             return True
@@ -113,13 +161,12 @@ class DocumentationGenerator:
         """Generate security documentation."""
         try:
             security_dir = self.output_dir / "security"
-            security_dir.mkdir(exist_ok=True)
+            self._ensure_dir(security_dir)
             
             markdown = self._generate_security_markdown(security_info)
             
             guide_path = security_dir / "README.md"
-            with open(guide_path, 'w') as f:
-                f.write(markdown)
+            guide_path.write_text(markdown, encoding='utf-8')
             
             logger.info("Generated security documentation")
             return True
@@ -131,13 +178,12 @@ class DocumentationGenerator:
         """Generate compliance documentation."""
         try:
             compliance_dir = self.output_dir / "compliance"
-            compliance_dir.mkdir(exist_ok=True)
+            self._ensure_dir(compliance_dir)
             
             markdown = self._generate_compliance_markdown(compliance_info)
             
             guide_path = compliance_dir / "README.md"
-            with open(guide_path, 'w') as f:
-                f.write(markdown)
+            guide_path.write_text(markdown, encoding='utf-8')
             
             logger.info("Generated compliance documentation")
             return True
@@ -149,13 +195,12 @@ class DocumentationGenerator:
         """Generate monitoring documentation."""
         try:
             monitoring_dir = self.output_dir / "monitoring"
-            monitoring_dir.mkdir(exist_ok=True)
+            self._ensure_dir(monitoring_dir)
             
             markdown = self._generate_monitoring_markdown(monitoring_info)
             
             guide_path = monitoring_dir / "README.md"
-            with open(guide_path, 'w') as f:
-                f.write(markdown)
+            guide_path.write_text(markdown, encoding='utf-8')
             
             logger.info("Generated monitoring documentation")
             return True
@@ -165,104 +210,55 @@ class DocumentationGenerator:
 
     def _generate_security_markdown(self, security_info: Dict[str, Any]) -> str:
         """Generate markdown content for security documentation."""
-        markdown = "# Security Documentation\n\n"
-        markdown += f"Last Updated: {datetime.now().strftime('%Y-%m-%d')}\n\n"
-        
-        for section, content in security_info.items():
-            markdown += f"## {section}\n\n"
-            if isinstance(content, list):
-                for item in content:
-                    markdown += f"- {item}\n"
-            elif isinstance(content, dict):
-                for key, value in content.items():
-                    markdown += f"### {key}\n\n{value}\n\n"
-            markdown += "\n"
-        
-        return markdown
+        header = _DOC_HEADER.substitute(
+            title="Security Documentation", date=today_iso())
+        return header + _render_sections(security_info)
 
     def _generate_compliance_markdown(self, compliance_info: Dict[str, Any]) -> str:
         """Generate markdown content for compliance documentation."""
-        markdown = "# Compliance Documentation\n\n"
-        markdown += f"Last Updated: {datetime.now().strftime('%Y-%m-%d')}\n\n"
-        
-        for section, content in compliance_info.items():
-            markdown += f"## {section}\n\n"
-            if isinstance(content, list):
-                for item in content:
-                    markdown += f"- {item}\n"
-            elif isinstance(content, dict):
-                for key, value in content.items():
-                    markdown += f"### {key}\n\n{value}\n\n"
-            markdown += "\n"
-        
-        return markdown
+        header = _DOC_HEADER.substitute(
+            title="Compliance Documentation", date=today_iso())
+        return header + _render_sections(compliance_info)
 
     def _generate_monitoring_markdown(self, monitoring_info: Dict[str, Any]) -> str:
         """Generate markdown content for monitoring documentation."""
-        markdown = "# Monitoring Documentation\n\n"
-        markdown += f"Last Updated: {datetime.now().strftime('%Y-%m-%d')}\n\n"
-        
-        for section, content in monitoring_info.items():
-            markdown += f"## {section}\n\n"
-            if isinstance(content, list):
-                for item in content:
-                    markdown += f"- {item}\n"
-            elif isinstance(content, dict):
-                for key, value in content.items():
-                    markdown += f"### {key}\n\n{value}\n\n"
-            markdown += "\n"
-        
-        return markdown
+        header = _DOC_HEADER.substitute(
+            title="Monitoring Documentation", date=today_iso())
+        return header + _render_sections(monitoring_info)
     
     def _generate_markdown(self, title: str, content: Dict[str, Any], version: str) -> str:
         """Generate markdown content for user guide."""
-        markdown = f"# {title}\n\n"
-        markdown += f"Version: {version}\n"
-        markdown += f"Last Updated: {datetime.now().strftime('%Y-%m-%d')}\n\n"
-        
-        for section, items in content.items():
-            markdown += f"## {section}\n\n"
-            if isinstance(items, list):
-                for item in items:
-                    markdown += f"- {item}\n"
-            elif isinstance(items, dict):
-                for key, value in items.items():
-                    markdown += f"### {key}\n\n{value}\n\n"
-            markdown += "\n"
-        
-        return markdown
+        header = _VERSIONED_DOC_HEADER.substitute(
+            title=title, version=version, date=today_iso())
+        return header + _render_sections(content)
     
     def _generate_openapi_spec(self, endpoints: List[Dict[str, Any]], version: str) -> Dict[str, Any]:
         """Generate OpenAPI specification."""
-        spec = {
+        # Several methods can share a path, so group operations per path
+        # instead of replacing the whole path item for each endpoint
+        paths = defaultdict(dict)
+        for endpoint in endpoints:
+            paths[endpoint['path']][endpoint['method'].lower()] = {
+                'summary': endpoint['summary'],
+                'description': endpoint['description'],
+                'parameters': endpoint.get('parameters', []),
+                'responses': endpoint.get('responses', {})
+            }
+
+        return {
             'openapi': '3.0.0',
             'info': {
                 'title': 'HR Analytics API',
                 'version': version,
                 'description': 'API documentation for HR Analytics system'
             },
-            'paths': {}
+            'paths': dict(paths)
         }
-        
-        for endpoint in endpoints:
-            path = endpoint['path']
-            method = endpoint['method'].lower()
-            
-            spec['paths'][path] = {
-                method: {
-                    'summary': endpoint['summary'],
-                    'description': endpoint['description'],
-                    'parameters': endpoint.get('parameters', []),
-                    'responses': endpoint.get('responses', {})
-                }
-            }
-        
-        return spec
     
     def _generate_api_markdown(self, endpoints: List[Dict[str, Any]], version: str) -> str:
         """Generate markdown documentation for API."""
-        markdown = f"# API Documentation v{version}\n\n"
-        markdown += f"Last Updated: {datetime.now().strftime('%Y-%m-%d')}\n\n"
+        markdown = _DOC_HEADER.substitute(
+            title=f"API Documentation v{version}", date=today_iso())
         
         for endpoint in endpoints:
             markdown += f"## {endpoint['method']} {endpoint['path']}\n\n"
@@ -285,8 +281,8 @@ class DocumentationGenerator:
     
     def _generate_troubleshooting_markdown(self, issues: List[Dict[str, Any]]) -> str:
         """Generate markdown content for troubleshooting guide."""
-        markdown = "# Troubleshooting Guide\n\n"
-        markdown += f"Last Updated: {datetime.now().strftime('%Y-%m-%d')}\n\n"
+        markdown = _DOC_HEADER.substitute(
+            title="Troubleshooting Guide", date=today_iso())
         
         for issue in issues:
             markdown += f"## {issue['title']}\n\n"
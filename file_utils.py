@@ -0,0 +1,15 @@
+import os
+
+def tail_lines(path, n, chunk_size=4096):
+    """Return the last n lines of a file, reading backwards from the end"""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        buf = b''
+        # n + 1 newlines guarantee n complete lines, the last one ending in \n
+        while buf.count(b'\n') <= n and pos > 0:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+    return [line.decode(errors='replace') for line in buf.splitlines()[-n:]]
@@ -7,7 +7,6 @@ import os
 from datetime import datetime
 from typing import Dict, List, Optional
 import logging
-from pynput import keyboard, mouse
 
 # Configure logging
 logging.basicConfig(
@@ -16,26 +15,46 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Only every N-th buffer flush is logged; flushes can be frequent under heavy input
+_LOG_EVERY = 10
+
 class HIDSystemIntegration:
-    def __init__(self, config_path='config.json'):
-        self.config = self._load_config(config_path)
+    def __init__(self, config_path='config.json', config=None):
+        self.config = self._load_config(config_path, config)
         self.data_buffer = []
         self.last_save_time = time.time()
         self.is_running = False
         self.keyboard_listener = None
         self.mouse_listener = None
         self.system_monitor_thread = None
+        # Latest system snapshot attached to every HID event. Only the
+        # system monitor thread samples psutil; event callbacks read this.
+        self._cached_state = {
+            'timestamp': datetime.now().isoformat(),
+            'cpu_percent': 0.0,
+            'memory_percent': 0.0,
+            'active_processes': 0
+        }
+        self._last_move_xy = (0, 0)
+        self._last_move_ns = 0
+        self._flush_count = 0
         
-    def _load_config(self, config_path):
+    def _load_config(self, config_path, config=None):
         default_config = {
             'data_save_interval': 300,  # seconds
             'output_dir': 'hid_system_data',
             'system_metrics_interval': 1,  # seconds
             'keyboard_sampling_rate': 0.1,  # seconds
             'mouse_sampling_rate': 0.1,  # seconds
-            'max_buffer_size': 1000
+            'max_buffer_size': 1000,
+            'mouse_move_min_pixels': 5,  # coalesce moves smaller than this...
+            'mouse_move_min_ms': 50  # ...that arrive within this window
         }
         
+        # An already-parsed config skips reading config_path again
+        if config is not None:
+            return {**default_config, **config}
+            
         try:
             with open(config_path, 'r') as f:
                 config = json.load(f)
@@ -47,7 +66,11 @@ class HIDSystemIntegration:
         """Start the HID and system monitoring"""
         if self.is_running:
             return
-            
+
+        # pynput probes the platform input backend (X11, Quartz, win32 hooks)
+        # on import, so only pay for it once monitoring actually starts
+        from pynput import keyboard, mouse
+
         # Create output directory if it doesn't exist
         os.makedirs(self.config['output_dir'], exist_ok=True)
         
@@ -110,7 +133,7 @@ class HIDSystemIntegration:
             }
             self._add_to_buffer(key_data)
         except Exception as e:
-            logger.error(f"Error processing key press: {e}")
+            logger.error("Error processing key press: %s", e)
             
     def _on_key_release(self, key):
         """Handle keyboard key release events"""
@@ -124,11 +147,21 @@ class HIDSystemIntegration:
             }
             self._add_to_buffer(key_data)
         except Exception as e:
-            logger.error(f"Error processing key release: {e}")
+            logger.error("Error processing key release: %s", e)
             
     def _on_mouse_move(self, x, y):
         """Handle mouse movement events"""
         try:
+            # Drop moves that are both tiny and close in time to the last
+            # recorded one; drags can emit hundreds of events per second
+            now_ns = time.monotonic_ns()
+            last_x, last_y = self._last_move_xy
+            if (abs(x - last_x) + abs(y - last_y) < self.config['mouse_move_min_pixels']
+                    and now_ns - self._last_move_ns < self.config['mouse_move_min_ms'] * 1_000_000):
+                return
+            self._last_move_xy = (x, y)
+            self._last_move_ns = now_ns
+
             mouse_data = {
                 'timestamp': datetime.now().isoformat(),
                 'type': 'mouse',
@@ -138,7 +171,7 @@ class HIDSystemIntegration:
             }
             self._add_to_buffer(mouse_data)
         except Exception as e:
-            logger.error(f"Error processing mouse move: {e}")
+            logger.error("Error processing mouse move: %s", e)
             
     def _on_mouse_click(self, x, y, button, pressed):
         """Handle mouse click events"""
@@ -154,7 +187,7 @@ class HIDSystemIntegration:
             }
             self._add_to_buffer(mouse_data)
         except Exception as e:
-            logger.error(f"Error processing mouse click: {e}")
+            logger.error("Error processing mouse click: %s", e)
             
     def _on_mouse_scroll(self, x, y, dx, dy):
         """Handle mouse scroll events"""
@@ -169,22 +202,32 @@ class HIDSystemIntegration:
             }
             self._add_to_buffer(mouse_data)
         except Exception as e:
-            logger.error(f"Error processing mouse scroll: {e}")
+            logger.error("Error processing mouse scroll: %s", e)
             
     def _system_monitor_loop(self):
         """Monitor system metrics at regular intervals"""
+        # The first cpu_percent() call only primes psutil and returns 0.0
+        psutil.cpu_percent(interval=None)
         while self.is_running:
             try:
+                time.sleep(self.config['system_metrics_interval'])
+
+                timestamp = datetime.now().isoformat()
+                metrics = self._get_system_metrics()
+                self._cached_state = {
+                    'timestamp': timestamp,
+                    'cpu_percent': metrics['cpu_percent'],
+                    'memory_percent': metrics['memory_percent'],
+                    'active_processes': metrics['process_count']
+                }
                 system_data = {
-                    'timestamp': datetime.now().isoformat(),
+                    'timestamp': timestamp,
                     'type': 'system',
-                    'metrics': self._get_system_metrics()
+                    'metrics': metrics
                 }
                 self._add_to_buffer(system_data)
-                
-                time.sleep(self.config['system_metrics_interval'])
             except Exception as e:
-                logger.error(f"Error in system monitoring: {e}")
+                logger.error("Error in system monitoring: %s", e)
                 time.sleep(1)  # Prevent tight loop on error
                 
     def _data_save_loop(self):
@@ -197,7 +240,7 @@ class HIDSystemIntegration:
                     self.last_save_time = current_time
                 time.sleep(1)
             except Exception as e:
-                logger.error(f"Error in data save loop: {e}")
+                logger.error("Error in data save loop: %s", e)
                 time.sleep(1)
                 
     def _add_to_buffer(self, data):
@@ -218,19 +261,22 @@ class HIDSystemIntegration:
             with open(filename, 'w') as f:
                 json.dump(self.data_buffer, f, indent=2)
             self.data_buffer = []
-            logger.info(f"Saved data to {filename}")
+            self._flush_count += 1
+            if self._flush_count % _LOG_EVERY == 0:
+                logger.info("Saved data to %s (%d flushes)", filename, self._flush_count)
         except Exception as e:
-            logger.error(f"Error saving data: {e}")
+            logger.error("Error saving data: %s", e)
             
     def _get_system_metrics(self):
         """Get current system metrics"""
+        net_io = psutil.net_io_counters()
         return {
             'cpu_percent': psutil.cpu_percent(interval=None),
             'memory_percent': psutil.virtual_memory().percent,
             'disk_usage': psutil.disk_usage('/').percent,
             'network_io': {
-                'bytes_sent': psutil.net_io_counters().bytes_sent,
-                'bytes_recv': psutil.net_io_counters().bytes_recv
+                'bytes_sent': net_io.bytes_sent,
+                'bytes_recv': net_io.bytes_recv
             },
             'process_count': len(psutil.pids()),
             'system_info': {
@@ -242,13 +288,8 @@ class HIDSystemIntegration:
         }
         
     def _get_system_state(self):
-        """Get current system state for correlation"""
-        return {
-            'timestamp': datetime.now().isoformat(),
-            'cpu_percent': psutil.cpu_percent(interval=None),
-            'memory_percent': psutil.virtual_memory().percent,
-            'active_processes': len(psutil.pids())
-        }
+        """Get the latest system state sampled by the monitor thread"""
+        return self._cached_state
 
 if __name__ == "__main__":
     integration = HIDSystemIntegration()
@@ -1,13 +1,113 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
+from flask import Flask, Response, render_template, request, redirect, url_for, flash, session
 from flask_login import LoginManager, login_user, login_required, logout_user, current_user
+from flask_limiter import Limiter
+from flask_limiter.util import get_remote_address
 from datetime import datetime
+import atexit
 import os
-from models import db, User, bcrypt
+import re
+import threading
+import time
+from sqlalchemy import bindparam, exists
+from sqlalchemy.exc import IntegrityError
+from models import db, User, bcrypt, load_cached_user, invalidate_cached_user
 from api_routes import api
 from roles import Role, admin_required, employee_required
 from email_validator import validate_email, EmailNotValidError
 
-def create_app():
+# Cheap syntactic pre-check; only plausible addresses reach email_validator
+_EMAIL_RE = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+# RFC 5321 path limit, also enforced by email_validator
+_EMAIL_MAX_LENGTH = 254
+
+def is_valid_email(email):
+    if len(email) > _EMAIL_MAX_LENGTH or not _EMAIL_RE.match(email):
+        return False
+    try:
+        # Skip the DNS MX lookup so registration never blocks on the network
+        validate_email(email, check_deliverability=False)
+    except EmailNotValidError:
+        return False
+    return True
+
+# last_login is informational only, so successful logins record it in memory
+# and a background thread writes the pending values in one batched UPDATE
+# instead of committing on the login request path.
+LAST_LOGIN_FLUSH_INTERVAL = 30
+_last_login_queue = {}
+_last_login_lock = threading.Lock()
+_last_login_flusher = None
+
+def record_last_login(user_id):
+    with _last_login_lock:
+        _last_login_queue[user_id] = datetime.utcnow()
+
+def flush_last_logins():
+    with _last_login_lock:
+        pending = dict(_last_login_queue)
+        _last_login_queue.clear()
+    if not pending:
+        return 0
+
+    users = User.__table__
+    stmt = users.update().where(users.c.id == bindparam('_id')).values(
+        last_login=bindparam('_last_login')
+    )
+    try:
+        db.session.execute(stmt, [
+            {'_id': user_id, '_last_login': ts} for user_id, ts in pending.items()
+        ])
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        # Put the values back unless a newer login superseded them
+        with _last_login_lock:
+            for user_id, ts in pending.items():
+                _last_login_queue.setdefault(user_id, ts)
+        raise
+    return len(pending)
+
+def start_last_login_flusher(app):
+    global _last_login_flusher
+    if _last_login_flusher is not None:
+        return
+
+    def flush():
+        with app.app_context():
+            try:
+                flush_last_logins()
+            except Exception:
+                app.logger.exception('Failed to flush last_login updates')
+
+    def run():
+        while True:
+            time.sleep(LAST_LOGIN_FLUSH_INTERVAL)
+            flush()
+
+    _last_login_flusher = threading.Thread(target=run, name='last-login-flusher', daemon=True)
+    _last_login_flusher.start()
+    atexit.register(flush)
+
+# Per-client cap on login attempts, so one client cannot keep the bcrypt
+# pool busy. Storage is per process unless RATELIMIT_STORAGE_URI is set.
+limiter = Limiter(key_func=get_remote_address)
+
+def duplicate_user_errors(exc):
+    """Map a unique-constraint IntegrityError on User to form errors.
+
+    PostgreSQL reports the violated constraint/index name (ix_user_email);
+    SQLite and MySQL only name it in the message (user.email, 'ix_user_email').
+    """
+    diag = getattr(exc.orig, 'diag', None)
+    detail = getattr(diag, 'constraint_name', None) or str(exc.orig)
+    errors = []
+    if 'username' in detail:
+        errors.append('Username already exists')
+    if 'email' in detail:
+        errors.append('Email already exists')
+    return errors or ['Username or email already exists']
+
+def create_app(config=None):
     app = Flask(__name__)
     
     # Production configuration
@@ -16,14 +116,39 @@ def create_app():
     app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
         'pool_pre_ping': True,
         'pool_recycle': 300,
-        'pool_size': 20,
-        'max_overflow': 10
+        'pool_size': int(os.environ.get('DB_POOL_SIZE', '10')),
+        'max_overflow': int(os.environ.get('DB_MAX_OVERFLOW', '20')),
+        # Fail fast instead of stalling a worker when the pool is exhausted
+        'pool_timeout': int(os.environ.get('DB_POOL_TIMEOUT', '10')),
+        # Reuse the most recently returned connection so idle ones can be recycled
+        'pool_use_lifo': True,
+        # Compiled-statement cache shared by all connections of the engine
+        'query_cache_size': int(os.environ.get('DB_QUERY_CACHE_SIZE', '1000'))
     }
+    if app.config['SQLALCHEMY_DATABASE_URI'].startswith('postgresql'):
+        app.config['SQLALCHEMY_ENGINE_OPTIONS']['connect_args'] = {'application_name': 'hr_logs'}
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    # Calibrate per host with benchmark_bcrypt.py (~100ms per hash)
+    app.config['BCRYPT_LOG_ROUNDS'] = int(os.environ.get('BCRYPT_ROUNDS', '12'))
+    app.config['LOGIN_RATE_LIMIT'] = os.environ.get('LOGIN_RATE_LIMIT', '10 per minute')
+    app.config['RATELIMIT_STORAGE_URI'] = os.environ.get('RATELIMIT_STORAGE_URI', 'memory://')
+    # Overrides (e.g. from tests) must be in place before extensions read them
+    if config:
+        app.config.update(config)
 
     # Initialize extensions
     db.init_app(app)
+
+    # Outside debug mode templates never change under a running process, so
+    # skip the per-render mtime check, never evict compiled templates, and
+    # parse all of them now instead of on the first request
+    if not app.debug:
+        app.config['TEMPLATES_AUTO_RELOAD'] = False
+        app.jinja_options = {**app.jinja_options, 'cache_size': -1}
+    for name in app.jinja_env.list_templates():
+        app.jinja_env.get_template(name)
     bcrypt.init_app(app)
+    limiter.init_app(app)
     login_manager = LoginManager()
     login_manager.init_app(app)
     login_manager.login_view = 'login'
@@ -31,14 +156,32 @@ def create_app():
     # Register blueprints
     app.register_blueprint(api, url_prefix='/api')
 
+    if not app.testing:
+        start_last_login_flusher(app)
+
     @login_manager.user_loader
     def load_user(user_id):
-        return User.query.get(int(user_id))
+        return load_cached_user(int(user_id))
+
+    # Rendered HTML for templates that hold no per-request data. Entries are
+    # keyed by template mtime while Jinja auto-reload is on (development).
+    static_pages = {}
+
+    def render_static(name):
+        if '_flashes' in session:
+            return render_template(name)
+        mtime = None
+        if app.jinja_env.auto_reload:
+            mtime = os.stat(os.path.join(app.root_path, app.template_folder, name)).st_mtime_ns
+        cached = static_pages.get(name)
+        if cached is None or cached[0] != mtime:
+            cached = static_pages[name] = (mtime, render_template(name))
+        return Response(cached[1], mimetype='text/html')
 
     # Routes
     @app.route('/')
     def index():
-        return render_template('index.html')
+        return render_static('index.html')
 
     @app.route('/register', methods=['GET', 'POST'])
     def register():
@@ -54,22 +197,13 @@ def create_app():
                 errors.append('Username must be at least 3 characters long')
             if not email:
                 errors.append('Email is required')
-            else:
-                try:
-                    validate_email(email)
-                except EmailNotValidError:
-                    errors.append('Invalid email address')
+            elif not is_valid_email(email):
+                errors.append('Invalid email address')
             if not password or len(password) < 8:
                 errors.append('Password must be at least 8 characters long')
             if password != confirm_password:
                 errors.append('Passwords do not match')
 
-            # Check if username or email already exists
-            if User.query.filter_by(username=username).first():
-                errors.append('Username already exists')
-            if User.query.filter_by(email=email).first():
-                errors.append('Email already exists')
-
             if errors:
                 for error in errors:
                     flash(error)
@@ -84,14 +218,23 @@ def create_app():
             new_user.password = password  # This will be hashed automatically
 
             db.session.add(new_user)
-            db.session.commit()
+            try:
+                db.session.commit()
+            except IntegrityError as e:
+                # Uniqueness is left to the database constraints, so the
+                # common (unique) case costs a single INSERT
+                db.session.rollback()
+                for error in duplicate_user_errors(e):
+                    flash(error)
+                return render_template('register.html')
 
             flash('Registration successful! Please log in.')
             return redirect(url_for('login'))
 
-        return render_template('register.html')
+        return render_static('register.html')
 
     @app.route('/login', methods=['GET', 'POST'])
+    @limiter.limit(lambda: app.config['LOGIN_RATE_LIMIT'], methods=['POST'])
     def login():
         if request.method == 'POST':
             username = request.form.get('username')
@@ -100,15 +243,19 @@ def create_app():
             
             if user and user.verify_password(password):
                 login_user(user)
-                user.last_login = datetime.utcnow()
-                db.session.commit()
+                if user.password_needs_rehash():
+                    user.password = password
+                    db.session.commit()
+                record_last_login(user.id)
                 return redirect(url_for('dashboard'))
             flash('Invalid username or password')
-        return render_template('login.html')
+            return render_template('login.html')
+        return render_static('login.html')
 
     @app.route('/logout')
     @login_required
     def logout():
+        invalidate_cached_user(current_user.id)
         logout_user()
         return redirect(url_for('index'))
 
@@ -129,7 +276,7 @@ if __name__ == '__main__':
     with app.app_context():
         db.create_all()
         # Create admin user if not exists
-        if not User.query.filter_by(username='admin').first():
+        if not db.session.query(exists().where(User.username == 'admin')).scalar():
             admin = User(
                 username='admin',
                 email='admin@example.com',
@@ -1,23 +1,109 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, g, jsonify, request, stream_with_context
 from flask_login import login_required, current_user
 from datetime import datetime
-from models import User, Role, Log, Department, HRLog
+from sqlalchemy import select, text
+from models import User, Role, Log, Department, HRLog, LogStatusCount, invalidate_cached_user
 from .. import db
 from .roles import admin_required
 import psutil
 import os
+import orjson
+import threading
+import time
 
 api = Blueprint('api', __name__)
 
+# Rows fetched from the database cursor per chunk when streaming log lists
+LOG_STREAM_CHUNK = 500
+
+# Same keys as HRLog.to_dict(), selected as plain columns
+HRLOG_COLUMNS = (
+    HRLog.id,
+    HRLog.user_id,
+    HRLog.log_type,
+    HRLog.description,
+    HRLog.timestamp,
+    HRLog.status,
+    HRLog.ml_confidence,
+    HRLog.ml_prediction,
+    HRLog.updated_at,
+)
+
+# Same keys as User.to_dict()
+USER_COLUMNS = (
+    User.id,
+    User.username,
+    User.email,
+    User.role,
+    User.created_at,
+    User.last_login,
+)
+
+def json_response(payload, status=200):
+    """Serialize with orjson; datetimes are written in isoformat() form natively."""
+    return Response(orjson.dumps(payload), status=status, mimetype='application/json')
+
+# Health endpoints are polled by monitors and several workers; reuse recent
+# samples instead of hitting psutil and the database on every request
+SYSTEM_STATS_TTL = 1.0
+DB_HEALTH_TTL = 5.0
+_sys_stats = (float('-inf'), 0.0, 0.0)  # (sampled_at, cpu_percent, memory_percent)
+_db_health = (float('-inf'), None)  # (checked_at, error message or None)
+_health_lock = threading.Lock()
+
+def system_stats():
+    """Return (cpu_percent, memory_percent), sampled at most once per SYSTEM_STATS_TTL."""
+    global _sys_stats
+    sampled_at, cpu_percent, memory_percent = _sys_stats
+    if time.monotonic() - sampled_at > SYSTEM_STATS_TTL:
+        with _health_lock:
+            now = time.monotonic()
+            if now - _sys_stats[0] > SYSTEM_STATS_TTL:
+                _sys_stats = (now, psutil.cpu_percent(interval=None), psutil.virtual_memory().percent)
+            _, cpu_percent, memory_percent = _sys_stats
+    return cpu_percent, memory_percent
+
+def database_error():
+    """Return the last connectivity error (None if healthy), checked at most once per DB_HEALTH_TTL."""
+    global _db_health
+    checked_at, error = _db_health
+    if time.monotonic() - checked_at > DB_HEALTH_TTL:
+        try:
+            # Straight from the engine pool; no ORM session is involved
+            with db.engine.connect() as conn:
+                conn.execute(text('SELECT 1'))
+            error = None
+        except Exception as e:
+            error = str(e)
+        _db_health = (time.monotonic(), error)
+    return error
+
+@api.before_request
+def _bind_session():
+    # Resolve the scoped session once per request instead of going through
+    # the thread-local proxy on every db.session access
+    g.s = db.session()
+
 @api.route('/logs', methods=['GET'])
 @login_required
 def get_logs():
     """Get all logs for the current user or all logs if admin"""
-    if current_user.role == Role.ADMIN:
-        logs = HRLog.query.order_by(HRLog.timestamp.desc()).all()
-    else:
-        logs = HRLog.query.filter_by(user_id=current_user.id).order_by(HRLog.timestamp.desc()).all()
-    return jsonify([log.to_dict() for log in logs])
+    query = select(*HRLOG_COLUMNS).order_by(HRLog.timestamp.desc())
+    if current_user.role != Role.ADMIN:
+        query = query.where(HRLog.user_id == current_user.id)
+    result = g.s.execute(query.execution_options(stream_results=True)).mappings()
+
+    # Emit the JSON array chunk by chunk so memory stays bounded by
+    # LOG_STREAM_CHUNK rows and the client can start parsing immediately
+    def generate():
+        yield b'['
+        separator = b''
+        for rows in result.partitions(LOG_STREAM_CHUNK):
+            yield separator + b','.join(orjson.dumps(dict(row)) for row in rows)
+            separator = b','
+        yield b']'
+
+    return Response(stream_with_context(generate()), mimetype='application/json')
 
 @api.route('/logs', methods=['POST'])
 @login_required
@@ -36,8 +122,8 @@ def create_log():
         timestamp=datetime.utcnow()
     )
     
-    db.session.add(new_log)
-    db.session.commit()
+    g.s.add(new_log)
+    g.s.commit()
     
     return jsonify(new_log.to_dict()), 201
 
@@ -61,7 +147,7 @@ def update_log(log_id):
     if 'description' in data:
         log.description = data['description']
     
-    db.session.commit()
+    g.s.commit()
     return jsonify(log.to_dict())
 
 @api.route('/logs/<int:log_id>', methods=['DELETE'])
@@ -73,16 +159,16 @@ def delete_log(log_id):
     if log.user_id != current_user.id and current_user.role != Role.ADMIN:
         return jsonify({'error': 'Unauthorized'}), 403
     
-    db.session.delete(log)
-    db.session.commit()
+    g.s.delete(log)
+    g.s.commit()
     return jsonify({'message': 'Log deleted successfully'})
 
 @api.route('/users', methods=['GET'])
 @admin_required
 def get_users():
     """Get all users (admin only)"""
-    users = User.query.all()
-    return jsonify([user.to_dict() for user in users])
+    rows = g.s.execute(select(*USER_COLUMNS)).mappings()
+    return json_response([dict(row) for row in rows])
 
 @api.route('/users/<int:user_id>', methods=['PUT'])
 @admin_required
@@ -99,22 +185,19 @@ def update_user(user_id):
     if 'email' in data:
         user.email = data['email']
     
-    db.session.commit()
+    g.s.commit()
+    invalidate_cached_user(user_id)
     return jsonify(user.to_dict())
 
 @api.route('/health')
 def health_check():
     """Health check endpoint for monitoring"""
-    try:
-        # Check database connection
-        db.session.execute('SELECT 1')
-        db_status = 'healthy'
-    except Exception as e:
-        db_status = f'unhealthy: {str(e)}'
+    # Check database connection
+    db_error = database_error()
+    db_status = 'healthy' if db_error is None else f'unhealthy: {db_error}'
     
     # Check system resources
-    cpu_percent = psutil.cpu_percent()
-    memory_percent = psutil.virtual_memory().percent
+    cpu_percent, memory_percent = system_stats()
     
     return jsonify({
         'status': 'healthy',
@@ -129,12 +212,12 @@ def health_check():
 @admin_required
 def get_statistics():
     total_users = User.query.count()
-    active_logs = HRLog.query.filter_by(status='active').count()
-    pending_approvals = HRLog.query.filter_by(status='pending').count()
+    status_counts = dict(g.s.query(LogStatusCount.status, LogStatusCount.n).all())
+    active_logs = status_counts.get('active', 0)
+    pending_approvals = status_counts.get('pending', 0)
     
     # Calculate system health (simplified example)
-    cpu_percent = psutil.cpu_percent()
-    memory_percent = psutil.virtual_memory().percent
+    cpu_percent, memory_percent = system_stats()
     system_health = 100 - ((cpu_percent + memory_percent) / 2)
     
     return jsonify({
@@ -148,14 +231,10 @@ def get_statistics():
 @login_required
 @admin_required
 def get_admin_users():
-    users = User.query.all()
-    return jsonify([{
-        'id': user.id,
-        'username': user.username,
-        'email': user.email,
-        'role': user.role,
-        'last_login': user.last_login.isoformat() if user.last_login else None
-    } for user in users])
+    rows = g.s.execute(
+        select(User.id, User.username, User.email, User.role, User.last_login)
+    ).mappings()
+    return json_response([dict(row) for row in rows])
 
 @api.route('/admin/users/<int:user_id>', methods=['GET', 'PUT', 'DELETE'])
 @login_required
@@ -176,19 +255,22 @@ def manage_user(user_id):
         user.username = data['username']
         user.email = data['email']
         user.role = data['role']
-        db.session.commit()
+        g.s.commit()
+        invalidate_cached_user(user_id)
         return jsonify({'message': 'User updated successfully'})
     
     elif request.method == 'DELETE':
-        db.session.delete(user)
-        db.session.commit()
+        g.s.delete(user)
+        g.s.commit()
+        invalidate_cached_user(user_id)
         return jsonify({'message': 'User deleted successfully'})
 
 @api.route('/admin/logs')
 @login_required
 @admin_required
 def get_admin_logs():
-    logs = HRLog.query.join(User).add_columns(
+    # Plain column tuples: no HRLog entities are hydrated or tracked
+    rows = g.s.query(
         HRLog.id,
         User.username,
         HRLog.log_type,
@@ -196,17 +278,17 @@ def get_admin_logs():
         HRLog.status,
         HRLog.timestamp,
         HRLog.admin_notes
-    ).all()
-    
-    return jsonify([{
-        'id': log.id,
-        'username': log.username,
-        'log_type': log.log_type,
-        'description': log.description,
-        'status': log.status,
-        'timestamp': log.timestamp.isoformat(),
-        'admin_notes': log.admin_notes
-    } for log in logs])
+    ).join(User, HRLog.user_id == User.id).yield_per(500)
+    
+    return json_response([{
+        'id': row.id,
+        'username': row.username,
+        'log_type': row.log_type,
+        'description': row.description,
+        'status': row.status,
+        'timestamp': row.timestamp,
+        'admin_notes': row.admin_notes
+    } for row in rows])
 
 @api.route('/admin/logs/<int:log_id>', methods=['GET', 'PUT'])
 @login_required
@@ -225,7 +307,7 @@ def manage_admin_log(log_id):
         data = request.get_json()
         log.status = data['status']
         log.admin_notes = data['admin_notes']
-        db.session.commit()
+        g.s.commit()
         return jsonify({'message': 'Log updated successfully'})
 
 @api.route('/admin/system-health')
@@ -233,15 +315,10 @@ def manage_admin_log(log_id):
 @admin_required
 def get_system_health():
     # Database status (simplified example)
-    try:
-        db.session.execute('SELECT 1')
-        db_status = 100
-    except:
-        db_status = 0
+    db_status = 100 if database_error() is None else 0
     
     # System resources
-    cpu_percent = psutil.cpu_percent()
-    memory_percent = psutil.virtual_memory().percent
+    cpu_percent, memory_percent = system_stats()
     system_resources = 100 - ((cpu_percent + memory_percent) / 2)
     
     return jsonify({
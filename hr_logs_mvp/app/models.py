@@ -1,19 +1,63 @@
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
 from flask_login import UserMixin
 from flask_bcrypt import Bcrypt
 from datetime import datetime
+from sqlalchemy import DDL, event
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import hmac
+import os
+import secrets
+import threading
+import time
 from .roles import Role
 
 db = SQLAlchemy()
 bcrypt = Bcrypt()
 
+# Bounded pool for bcrypt work. The calling request thread still blocks on
+# .result() for the whole hash; what the pool adds is a cap on concurrent
+# bcrypt CPU at os.cpu_count(). The per-IP login limit is what keeps a burst
+# of logins from tying up the request threads.
+BCRYPT_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count(), thread_name_prefix='bcrypt')
+
+# Short-lived memo of bcrypt verification results, keyed by an HMAC of the
+# candidate password and the stored hash, so a client retrying identical
+# credentials pays for one bcrypt round. An unkeyed digest would leave a fast
+# hash of the password next to its bcrypt hash; the per-process random key
+# keeps the cache from undoing bcrypt's work factor.
+_VERIFY_KEY = secrets.token_bytes(32)
+_VERIFY_CACHE_TTL = 60
+_VERIFY_CACHE_SIZE = 1024
+_verify_cache = OrderedDict()
+_verify_lock = threading.Lock()
+
+def _verify_cached(password_hash, password):
+    key = (hmac.new(_VERIFY_KEY, password.encode('utf-8'), 'sha256').digest(), password_hash)
+    now = time.monotonic()
+    with _verify_lock:
+        hit = _verify_cache.get(key)
+        if hit is not None and now - hit[1] < _VERIFY_CACHE_TTL:
+            return hit[0]
+
+    result = BCRYPT_EXECUTOR.submit(bcrypt.check_password_hash, password_hash, password).result()
+    with _verify_lock:
+        _verify_cache[key] = (result, now)
+        _verify_cache.move_to_end(key)
+        while len(_verify_cache) > _VERIFY_CACHE_SIZE:
+            _verify_cache.popitem(last=False)
+    return result
+
 class User(UserMixin, db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    username = db.Column(db.String(80), unique=True, nullable=False)
-    email = db.Column(db.String(120), unique=True, nullable=False)
+    username = db.Column(db.String(80), unique=True, nullable=False, index=True)
+    email = db.Column(db.String(120), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(128), nullable=False)
     role = db.Column(db.String(20), nullable=False, default=Role.EMPLOYEE)
-    logs = db.relationship('HRLog', backref='user', lazy=True)
+    # lazy='raise' on both sides: relationship access must be loaded
+    # explicitly in the query, never as a hidden per-row SELECT
+    logs = db.relationship('HRLog', backref=db.backref('user', lazy='raise'), lazy='raise')
     created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
     last_login = db.Column(db.DateTime, nullable=True)
 
@@ -23,10 +67,17 @@ class User(UserMixin, db.Model):
 
     @password.setter
     def password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = BCRYPT_EXECUTOR.submit(
+            bcrypt.generate_password_hash, password
+        ).result().decode('utf-8')
 
     def verify_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return _verify_cached(self.password_hash, password)
+
+    def password_needs_rehash(self):
+        """True when the stored hash uses a lower cost than BCRYPT_LOG_ROUNDS."""
+        stored_rounds = int(self.password_hash.split('$')[2])
+        return stored_rounds < current_app.config.get('BCRYPT_LOG_ROUNDS', 12)
 
     def to_dict(self):
         return {
@@ -38,6 +89,54 @@ class User(UserMixin, db.Model):
             'last_login': self.last_login.isoformat() if self.last_login else None
         }
 
+class CachedUser(UserMixin):
+    """Read-only snapshot of a User, used as Flask-Login's current_user."""
+
+    def __init__(self, id, username, email, role, last_login):
+        self.id = id
+        self.username = username
+        self.email = email
+        self.role = role
+        self.last_login = last_login
+
+# Authenticated-user snapshots, so load_user does not query the database on
+# every request. Writes in this process evict the entry immediately; the TTL
+# bounds how long other worker processes can serve a stale role or email.
+USER_CACHE_TTL = 30
+USER_CACHE_SIZE = 4096
+_user_cache = OrderedDict()
+_user_cache_lock = threading.Lock()
+
+def load_cached_user(user_id):
+    now = time.monotonic()
+    with _user_cache_lock:
+        hit = _user_cache.get(user_id)
+        if hit is not None and now - hit[1] < USER_CACHE_TTL:
+            _user_cache.move_to_end(user_id)
+            return hit[0]
+
+    row = db.session.query(
+        User.id, User.username, User.email, User.role, User.last_login
+    ).filter(User.id == user_id).first()
+    if row is None:
+        return None
+
+    user = CachedUser(*row)
+    with _user_cache_lock:
+        _user_cache[user_id] = (user, now)
+        _user_cache.move_to_end(user_id)
+        while len(_user_cache) > USER_CACHE_SIZE:
+            _user_cache.popitem(last=False)
+    return user
+
+def invalidate_cached_user(user_id):
+    with _user_cache_lock:
+        _user_cache.pop(user_id, None)
+
+def clear_cached_users():
+    with _user_cache_lock:
+        _user_cache.clear()
+
 class HRLog(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
@@ -49,6 +148,15 @@ class HRLog(db.Model):
     ml_prediction = db.Column(db.String(50), nullable=True)  # ML prediction label
     updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow)
 
+    __table_args__ = (
+        # Per-user log listing, newest first
+        db.Index('ix_hrlog_user_ts', user_id, timestamp.desc()),
+        # Status counts for the admin/stats endpoints
+        db.Index('ix_hrlog_status', status),
+        # Covers the per-type GROUP BY count without touching the table
+        db.Index('ix_hrlog_type_id', log_type, id),
+    )
+
     def to_dict(self):
         return {
             'id': self.id,
@@ -60,4 +168,73 @@ class HRLog(db.Model):
             'ml_confidence': self.ml_confidence,
             'ml_prediction': self.ml_prediction,
             'updated_at': self.updated_at.isoformat()
-        } 
\ No newline at end of file
+        } 
+
+class LogStatusCount(db.Model):
+    """Number of HRLog rows per status, maintained by database triggers.
+
+    The stats endpoints read this table instead of counting hr_log, so
+    their cost no longer grows with the number of logs.
+    """
+    status = db.Column(db.String(20), primary_key=True)
+    n = db.Column(db.BigInteger, nullable=False, default=0)
+
+# The triggers reference hr_log, so create this table after it
+LogStatusCount.__table__.add_is_dependent_on(HRLog.__table__)
+
+_LOG_STATUS_COUNT_DDL = [
+    # SQLite
+    DDL("""
+        CREATE TRIGGER hr_log_status_count_ins AFTER INSERT ON hr_log
+        BEGIN
+            INSERT OR IGNORE INTO log_status_count (status, n) VALUES (NEW.status, 0);
+            UPDATE log_status_count SET n = n + 1 WHERE status = NEW.status;
+        END
+    """).execute_if(dialect='sqlite'),
+    DDL("""
+        CREATE TRIGGER hr_log_status_count_upd AFTER UPDATE OF status ON hr_log
+        WHEN OLD.status IS NOT NEW.status
+        BEGIN
+            UPDATE log_status_count SET n = n - 1 WHERE status = OLD.status;
+            INSERT OR IGNORE INTO log_status_count (status, n) VALUES (NEW.status, 0);
+            UPDATE log_status_count SET n = n + 1 WHERE status = NEW.status;
+        END
+    """).execute_if(dialect='sqlite'),
+    DDL("""
+        CREATE TRIGGER hr_log_status_count_del AFTER DELETE ON hr_log
+        BEGIN
+            UPDATE log_status_count SET n = n - 1 WHERE status = OLD.status;
+        END
+    """).execute_if(dialect='sqlite'),
+    # PostgreSQL
+    DDL("""
+        CREATE OR REPLACE FUNCTION hr_log_status_count() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP = 'UPDATE' AND OLD.status IS NOT DISTINCT FROM NEW.status THEN
+                RETURN NULL;
+            END IF;
+            IF TG_OP IN ('UPDATE', 'DELETE') THEN
+                UPDATE log_status_count SET n = n - 1 WHERE status = OLD.status;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') THEN
+                INSERT INTO log_status_count (status, n) VALUES (NEW.status, 1)
+                ON CONFLICT (status) DO UPDATE SET n = log_status_count.n + 1;
+            END IF;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """).execute_if(dialect='postgresql'),
+    DDL("""
+        CREATE TRIGGER hr_log_status_count
+        AFTER INSERT OR DELETE OR UPDATE OF status ON hr_log
+        FOR EACH ROW EXECUTE PROCEDURE hr_log_status_count()
+    """).execute_if(dialect='postgresql'),
+    # Seed from any logs that predate the table
+    DDL("""
+        INSERT INTO log_status_count (status, n)
+        SELECT status, count(*) FROM hr_log GROUP BY status
+    """),
+]
+
+for _ddl in _LOG_STATUS_COUNT_DDL:
+    event.listen(LogStatusCount.__table__, 'after_create', _ddl)
@@ -1,6 +1,6 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
-from ..models.hr_log import HRLog, db
+from ..models.hr_log import HRLog, LogStatusCount, db
 from flask_login import login_required, current_user
 
 hr_logs_api = Blueprint('hr_logs_api', __name__, url_prefix='/api/hr_logs')
@@ -96,24 +96,25 @@ def delete_log(log_id):
 @login_required
 def get_stats():
     try:
-        # Get basic statistics about logs
-        total_logs = HRLog.query.count()
-        pending_logs = HRLog.query.filter_by(status='pending').count()
-        approved_logs = HRLog.query.filter_by(status='approved').count()
-        rejected_logs = HRLog.query.filter_by(status='rejected').count()
+        # Get basic statistics about logs (trigger-maintained counters)
+        status_counts = dict(db.session.query(LogStatusCount.status, LogStatusCount.n).all())
+        total_logs = sum(status_counts.values())
+        pending_logs = status_counts.get('pending', 0)
+        approved_logs = status_counts.get('approved', 0)
+        rejected_logs = status_counts.get('rejected', 0)
 
-        # Get logs by type
-        log_types = db.session.query(
+        # Get logs by type (index-only scan of ix_hrlog_type_id)
+        logs_by_type = dict(db.session.query(
             HRLog.log_type,
             db.func.count(HRLog.id)
-        ).group_by(HRLog.log_type).all()
+        ).group_by(HRLog.log_type).all())
 
         stats = {
             "total_logs": total_logs,
             "pending_logs": pending_logs,
             "approved_logs": approved_logs,
             "rejected_logs": rejected_logs,
-            "logs_by_type": {log_type: count for log_type, count in log_types}
+            "logs_by_type": logs_by_type
         }
 
         return jsonify(stats)
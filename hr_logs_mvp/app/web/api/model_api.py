@@ -1,37 +1,171 @@
 from flask import Blueprint, request, jsonify
 from datetime import datetime
 import numpy as np
+import tensorflow as tf
 from tensorflow.keras.models import load_model
-from tensorflow.keras.preprocessing.image import img_to_array, load_img
 import os
 import json
+import threading
+from collections import deque
 
 model_api = Blueprint('model_api', __name__, url_prefix='/api/model')
 
-# Initialize model and prediction history
+MODEL_DIR = os.path.join(os.path.dirname(__file__), '../../../ml/models')
+KERAS_MODEL_PATH = os.path.join(MODEL_DIR, 'hr_model.h5')
+# INT8 model produced by ml/quantize_model.py; served in preference to the .h5
+TFLITE_MODEL_PATH = os.path.join(MODEL_DIR, 'hr_model.tflite')
+
+# Append-only JSON Lines log of every prediction
+HISTORY_PATH = os.path.join(os.path.dirname(__file__), '../../../ml/data/prediction_history.jsonl')
+HISTORY_LIMIT = 1000
+
+IMAGE_SIZE = (224, 224)
+
+# Initialize model and prediction history (most recent entries only)
 model = None
-prediction_history = []
+prediction_history = deque(maxlen=HISTORY_LIMIT)
+
+# Last few predictions and their mean confidence, served by /real_time_status
+# without touching the history file
+RECENT_WINDOW = 5
+recent_predictions = deque(maxlen=RECENT_WINDOW)
+recent_avg_confidence = 0.0
+_recent_lock = threading.Lock()
+
+class TFLiteClassifier:
+    """Runs the quantized screenshot model through the TFLite interpreter."""
+
+    def __init__(self, model_path):
+        self.interpreter = tf.lite.Interpreter(model_path=model_path, num_threads=os.cpu_count())
+        self.interpreter.allocate_tensors()
+        self.input_details = self.interpreter.get_input_details()[0]
+        self.output_details = self.interpreter.get_output_details()[0]
+        # The interpreter holds per-invocation state and is not thread-safe
+        self._lock = threading.Lock()
+
+    def predict(self, batch):
+        """Return float probabilities for a float32 (N, 224, 224, 3) batch in [0, 1]."""
+        batch = self._quantize(batch, self.input_details)
+        with self._lock:
+            if tuple(self.input_details['shape']) != batch.shape:
+                self.interpreter.resize_tensor_input(self.input_details['index'], batch.shape)
+                self.interpreter.allocate_tensors()
+                self.input_details = self.interpreter.get_input_details()[0]
+                self.output_details = self.interpreter.get_output_details()[0]
+            self.interpreter.set_tensor(self.input_details['index'], batch)
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self.output_details['index'])
+        return self._dequantize(output, self.output_details)
+
+    @staticmethod
+    def _quantize(values, details):
+        scale, zero_point = details['quantization']
+        if not scale:
+            return values.astype(details['dtype'])
+        info = np.iinfo(details['dtype'])
+        quantized = np.round(values / scale + zero_point)
+        return np.clip(quantized, info.min, info.max).astype(details['dtype'])
+
+    @staticmethod
+    def _dequantize(values, details):
+        scale, zero_point = details['quantization']
+        if not scale:
+            return values.astype(np.float32)
+        return (values.astype(np.float32) - zero_point) * scale
+
+_model_lock = threading.Lock()
 
 def load_ml_model():
     global model
-    model_path = os.path.join(os.path.dirname(__file__), '../../../ml/models/hr_model.h5')
-    if os.path.exists(model_path):
-        model = load_model(model_path)
-    else:
-        print("Warning: Model file not found. Please train the model first.")
+    with _model_lock:
+        if model is not None:
+            return
+        if os.path.exists(TFLITE_MODEL_PATH):
+            model = TFLiteClassifier(TFLITE_MODEL_PATH)
+        elif os.path.exists(KERAS_MODEL_PATH):
+            model = load_model(KERAS_MODEL_PATH, compile=False)
+        else:
+            print("Warning: Model file not found. Please train the model first.")
+
+def init_model(app):
+    """Load the model and run one warm-up pass before serving traffic."""
+    intra_op_threads = app.config.get('TF_INTRA_OP_THREADS')
+    if intra_op_threads:
+        try:
+            tf.config.threading.set_intra_op_parallelism_threads(int(intra_op_threads))
+        except RuntimeError:
+            # Already fixed once the TF runtime has initialized
+            pass
+
+    with _recent_lock:
+        recent_predictions.extend(get_prediction_history(RECENT_WINDOW))
+        _update_recent_average()
+
+    load_ml_model()
+    if model is not None:
+        # Traces the decode graph, builds the model graph and JIT-compiles
+        # kernels outside the first request
+        blank = tf.io.encode_png(tf.zeros(IMAGE_SIZE + (3,), dtype=tf.uint8)).numpy()
+        predict_probabilities(_decode_resize_batch(tf.constant([blank])).numpy())
+
+@model_api.record_once
+def _init_model_on_register(state):
+    init_model(state.app)
+
+def _update_recent_average():
+    global recent_avg_confidence
+    recent_avg_confidence = (
+        sum(p['confidence'] for p in recent_predictions) / len(recent_predictions)
+        if recent_predictions else 0.0
+    )
+
+def record_predictions(entries):
+    with _recent_lock:
+        recent_predictions.extend(entries)
+        _update_recent_average()
+    prediction_history.extend(entries)
+    save_prediction_history(entries)
+
+def predict_probabilities(batch):
+    if model is None:
+        raise RuntimeError("Model not loaded. Please train the model first.")
+    if isinstance(model, TFLiteClassifier):
+        return model.predict(batch)
+    return model(batch, training=False).numpy()
+
+@tf.function(input_signature=[tf.TensorSpec([], tf.string)])
+def _decode_resize(raw):
+    # PNG or JPEG; nearest-neighbour resize matches load_img's default, which
+    # the training pipeline used
+    img = tf.io.decode_image(raw, channels=3, expand_animations=False)
+    img = tf.image.resize(img, IMAGE_SIZE, method='nearest')
+    return tf.cast(img, tf.float32) * (1.0 / 255.0)
+
+@tf.function(input_signature=[tf.TensorSpec([None], tf.string)])
+def _decode_resize_batch(raws):
+    return tf.map_fn(
+        _decode_resize, raws,
+        fn_output_signature=tf.TensorSpec(IMAGE_SIZE + (3,), tf.float32),
+        parallel_iterations=os.cpu_count()
+    )
+
+def _read_bytes(image_file):
+    if hasattr(image_file, 'read'):
+        return image_file.read()
+    with open(image_file, 'rb') as f:
+        return f.read()
+
+def preprocess_batch(image_files):
+    """Decode and resize encoded images into a float32 (N, 224, 224, 3) batch in [0, 1]."""
+    raws = tf.constant([_read_bytes(image_file) for image_file in image_files])
+    return _decode_resize_batch(raws).numpy()
 
 def preprocess_image(image_file):
-    img = load_img(image_file, target_size=(224, 224))
-    img_array = img_to_array(img)
-    img_array /= 255.0
-    return np.expand_dims(img_array, axis=0)
+    return preprocess_batch([image_file])
 
 def classify_screenshot(image_file):
-    if model is None:
-        load_ml_model()
-    
     processed = preprocess_image(image_file)
-    probabilities = model.predict(processed)[0]
+    probabilities = predict_probabilities(processed)[0]
     predicted_index = np.argmax(probabilities)
     confidence = float(probabilities[predicted_index])
     label = get_label_from_index(predicted_index)
@@ -41,33 +175,50 @@ def classify_screenshot(image_file):
         "label": label,
         "confidence": confidence
     }
-    prediction_history.append(log_entry)
-    save_prediction_history()
+    record_predictions([log_entry])
     return label, confidence
 
 def batch_classify_screenshots(image_files):
+    # One forward pass over an (N, 224, 224, 3) batch instead of N predict() calls
+    probabilities = predict_probabilities(preprocess_batch(image_files))
+    predicted_indices = probabilities.argmax(axis=1)
+    confidences = probabilities[np.arange(len(image_files)), predicted_indices]
+
+    timestamp = datetime.utcnow().isoformat()
     results = []
-    for image_file in image_files:
-        label, confidence = classify_screenshot(image_file)
-        results.append({
-            "label": label,
-            "confidence": confidence,
-            "timestamp": datetime.utcnow().isoformat()
-        })
+    for predicted_index, confidence in zip(predicted_indices, confidences):
+        log_entry = {
+            "timestamp": timestamp,
+            "label": get_label_from_index(predicted_index),
+            "confidence": float(confidence)
+        }
+        results.append(log_entry)
+    record_predictions(results)
     return results
 
-def get_prediction_history():
-    history_path = os.path.join(os.path.dirname(__file__), '../../../ml/data/prediction_history.json')
-    if os.path.exists(history_path):
-        with open(history_path, 'r') as f:
-            return json.load(f)
-    return prediction_history
+def _tail_lines(path, n, chunk_size=8192):
+    """Return the last n lines of a file, reading backwards from the end."""
+    with open(path, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        pos = f.tell()
+        data = b''
+        while pos > 0 and data.count(b'\n') <= n:
+            step = min(chunk_size, pos)
+            pos -= step
+            f.seek(pos)
+            data = f.read(step) + data
+    return [line.decode('utf-8') for line in data.splitlines()[-n:] if line]
+
+def get_prediction_history(limit=HISTORY_LIMIT):
+    if os.path.exists(HISTORY_PATH):
+        return [json.loads(line) for line in _tail_lines(HISTORY_PATH, limit)]
+    return list(prediction_history)
 
-def save_prediction_history():
-    history_path = os.path.join(os.path.dirname(__file__), '../../../ml/data/prediction_history.json')
-    os.makedirs(os.path.dirname(history_path), exist_ok=True)
-    with open(history_path, 'w') as f:
-        json.dump(prediction_history, f)
+def save_prediction_history(entries):
+    """Append new prediction entries to the JSON Lines history file."""
+    os.makedirs(os.path.dirname(HISTORY_PATH), exist_ok=True)
+    with open(HISTORY_PATH, 'a') as f:
+        f.write(''.join(json.dumps(entry) + '\n' for entry in entries))
 
 def get_label_from_index(index):
     labels = ["attendance", "leave", "performance", "incident", "other"]
@@ -112,16 +263,15 @@ def get_history():
 @model_api.route('/real_time_status', methods=['GET'])
 def real_time_status():
     try:
-        history = get_prediction_history()
-        recent_predictions = history[-5:] if len(history) >= 5 else history
-        
-        avg_confidence = np.mean([p['confidence'] for p in recent_predictions]) if recent_predictions else 0
-        
+        with _recent_lock:
+            recent = list(recent_predictions)
+            avg_confidence = recent_avg_confidence
+
         status_data = {
-            "current_batch_size": len(recent_predictions),
+            "current_batch_size": len(recent),
             "average_confidence": float(avg_confidence),
             "last_update": datetime.utcnow().isoformat(),
-            "recent_predictions": recent_predictions
+            "recent_predictions": recent
         }
         return jsonify(status_data)
     except Exception as e:
@@ -0,0 +1,41 @@
+"""Find the highest bcrypt cost that hashes within a time budget on this host.
+
+Usage:
+    python benchmark_bcrypt.py [--target-ms 100]
+
+Prints a BCRYPT_ROUNDS=<n> line to put in the environment (.env) so
+create_app() hashes new passwords at that cost.
+"""
+import argparse
+import time
+
+import bcrypt
+
+MIN_ROUNDS = 4
+MAX_ROUNDS = 16
+
+def hash_time_ms(rounds, samples=3):
+    salt = bcrypt.gensalt(rounds)
+    best = float('inf')
+    for _ in range(samples):
+        start = time.perf_counter()
+        bcrypt.hashpw(b'benchmark-password', salt)
+        best = min(best, (time.perf_counter() - start) * 1000)
+    return best
+
+def calibrate(target_ms):
+    chosen = MIN_ROUNDS
+    for rounds in range(MIN_ROUNDS, MAX_ROUNDS + 1):
+        elapsed = hash_time_ms(rounds)
+        print(f"cost {rounds:2d}: {elapsed:8.1f} ms")
+        if elapsed > target_ms:
+            break
+        chosen = rounds
+    return chosen
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--target-ms', type=float, default=100.0)
+    args = parser.parse_args()
+
+    print(f"BCRYPT_ROUNDS={calibrate(args.target_ms)}")
@@ -0,0 +1,54 @@
+"""Convert the Keras HR screenshot model to a full-integer (INT8) TFLite model.
+
+Usage:
+    python ml/quantize_model.py path/to/sample_screenshots [--samples 100]
+
+The sample screenshots are used as the representative dataset for
+post-training quantization; a few hundred typical images are enough.
+"""
+import argparse
+import os
+
+import numpy as np
+import tensorflow as tf
+from tensorflow.keras.preprocessing.image import img_to_array, load_img
+
+MODEL_DIR = os.path.join(os.path.dirname(__file__), 'models')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+def representative_dataset(image_dir, samples):
+    names = sorted(
+        name for name in os.listdir(image_dir)
+        if name.lower().endswith(IMAGE_EXTENSIONS)
+    )[:samples]
+
+    def generate():
+        for name in names:
+            img = img_to_array(load_img(os.path.join(image_dir, name), target_size=(224, 224)))
+            yield [np.expand_dims(img / 255.0, axis=0).astype(np.float32)]
+
+    return generate
+
+def quantize_model(keras_path, tflite_path, image_dir, samples=100):
+    model = tf.keras.models.load_model(keras_path, compile=False)
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset(image_dir, samples)
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    converter.inference_input_type = tf.uint8
+    converter.inference_output_type = tf.uint8
+
+    with open(tflite_path, 'wb') as f:
+        f.write(converter.convert())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('image_dir', help='Directory of representative screenshots')
+    parser.add_argument('--samples', type=int, default=100)
+    parser.add_argument('--model', default=os.path.join(MODEL_DIR, 'hr_model.h5'))
+    parser.add_argument('--output', default=os.path.join(MODEL_DIR, 'hr_model.tflite'))
+    args = parser.parse_args()
+
+    quantize_model(args.model, args.output, args.image_dir, args.samples)
+    print(f"Wrote quantized model to {args.output}")
@@ -0,0 +1,122 @@
+import os
+from functools import lru_cache
+
+import pytest
+from sqlalchemy import event
+
+os.environ.setdefault('SECRET_KEY', 'test-secret-key')
+
+from app import create_app
+from app.models import HRLog, User, clear_cached_users, db
+from app.roles import Role
+
+TEST_CONFIG = {
+    'TESTING': True,
+    'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+    'RATELIMIT_ENABLED': False,
+    # bcrypt's minimum cost: hashing is ~1ms instead of ~250ms at cost 12
+    'BCRYPT_LOG_ROUNDS': 4,
+}
+
+@lru_cache(maxsize=None)
+def _build_app(config_items):
+    app = create_app(dict(config_items))
+    # The production pool sizing does not apply to SQLite's in-memory pool
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+    return app
+
+@pytest.fixture(scope='session')
+def app():
+    # One Flask app per distinct config for the whole run
+    return _build_app(tuple(sorted(TEST_CONFIG.items())))
+
+@pytest.fixture(scope='session')
+def _schema(app):
+    with app.app_context():
+        engine = db.engine
+
+        # pysqlite manages transactions itself and breaks SAVEPOINT; let
+        # SQLAlchemy emit BEGIN instead
+        @event.listens_for(engine, 'connect')
+        def _no_pysqlite_transactions(dbapi_connection, connection_record):
+            dbapi_connection.isolation_level = None
+
+        @event.listens_for(engine, 'begin')
+        def _begin(conn):
+            conn.exec_driver_sql('BEGIN')
+
+        db.create_all()
+        yield
+        db.drop_all()
+
+@pytest.fixture(autouse=True)
+def _transaction(app, _schema):
+    """Run each test inside a transaction that is rolled back afterwards.
+
+    Application code commits and rolls back a SAVEPOINT, which is reopened
+    whenever it ends, so nothing a test writes outlives it.
+    """
+    with app.app_context():
+        connection = db.engine.connect()
+        trans = connection.begin()
+        nested = connection.begin_nested()
+
+        app_session = db.session
+        db.session = db.create_scoped_session(options={'bind': connection, 'binds': {}})
+
+        @event.listens_for(db.session(), 'after_transaction_end')
+        def _restart_savepoint(session, transaction):
+            nonlocal nested
+            if not nested.is_active:
+                nested = connection.begin_nested()
+
+        yield
+
+        db.session.remove()
+        db.session = app_session
+        trans.rollback()
+        connection.close()
+        # Rolled-back ids are reused by the next test's rows
+        clear_cached_users()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+def force_login(client, user):
+    """Log user in by writing Flask-Login's session keys, skipping POST /login."""
+    with client.session_transaction() as sess:
+        sess['_user_id'] = str(user.id)
+        sess['_fresh'] = True
+
+@pytest.fixture
+def login_as(client):
+    return lambda user: force_login(client, user)
+
+@pytest.fixture
+def logged_in_user(app, client):
+    # Seed the user through the ORM and forge Flask-Login's session cookie;
+    # test_auth.py covers the real /register and /login round-trips
+    user = User(
+        username='testuser',
+        email='test@example.com',
+        role=Role.EMPLOYEE
+    )
+    user.password = 'password123'
+    db.session.add(user)
+    db.session.commit()
+
+    force_login(client, user)
+    return user
+
+@pytest.fixture
+def seeded_log(logged_in_user):
+    log = HRLog(
+        user_id=logged_in_user.id,
+        log_type='attendance',
+        description='Test API log',
+        status='pending'
+    )
+    db.session.add(log)
+    db.session.commit()
+    return log
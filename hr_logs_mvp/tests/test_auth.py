@@ -1,23 +1,6 @@
-import pytest
-from app import create_app
-from app.models import User, db
+from app.models import User
 from app.roles import Role
 
-@pytest.fixture
-def app():
-    app = create_app()
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.session.remove()
-        db.drop_all()
-
-@pytest.fixture
-def client(app):
-    return app.test_client()
-
 def test_register(client):
     response = client.post('/register', data={
         'username': 'testuser',
@@ -1,49 +1,23 @@
 import pytest
-from app import create_app
+from unittest import mock
+from sqlalchemy.exc import OperationalError
 from app.models import User, HRLog, db
 from app.roles import Role
 from datetime import datetime
 from werkzeug.exceptions import HTTPException
+from app import limiter
 
-@pytest.fixture
-def app():
-    app = create_app()
-    app.config['TESTING'] = True
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'
-    with app.app_context():
-        db.create_all()
-        yield app
-        db.session.remove()
-        db.drop_all()
-
-@pytest.fixture
-def client(app):
-    return app.test_client()
-
-@pytest.fixture
-def logged_in_user(app, client):
-    client.post('/register', data={
-        'username': 'testuser',
-        'email': 'test@example.com',
-        'password': 'password123',
-        'confirm_password': 'password123'
-    })
-    client.post('/login', data={
-        'username': 'testuser',
-        'password': 'password123'
-    })
-    return User.query.filter_by(username='testuser').first()
+def existing_user(username, email):
+    user = User(username=username, email=email, role=Role.EMPLOYEE)
+    user.password = 'password123'
+    db.session.add(user)
+    db.session.commit()
+    return user
 
 # Authentication Edge Cases
 def test_register_duplicate_username(client):
-    # First registration
-    client.post('/register', data={
-        'username': 'testuser',
-        'email': 'test1@example.com',
-        'password': 'password123',
-        'confirm_password': 'password123'
-    })
-    
+    existing_user('testuser', 'test1@example.com')
+
     # Try to register with same username
     response = client.post('/register', data={
         'username': 'testuser',
@@ -54,14 +28,8 @@ def test_register_duplicate_username(client):
     assert b'Username already exists' in response.data
 
 def test_register_duplicate_email(client):
-    # First registration
-    client.post('/register', data={
-        'username': 'user1',
-        'email': 'test@example.com',
-        'password': 'password123',
-        'confirm_password': 'password123'
-    })
-    
+    existing_user('user1', 'test@example.com')
+
     # Try to register with same email
     response = client.post('/register', data={
         'username': 'user2',
@@ -114,69 +82,66 @@ def test_delete_nonexistent_log(client, logged_in_user):
     response = client.delete('/api/logs/999999')
     assert response.status_code == 404
 
-# Admin Edge Cases
-def test_admin_access_unauthorized(client, logged_in_user):
-    response = client.get('/api/admin/statistics')
-    assert response.status_code == 403
-
-def test_admin_update_nonexistent_user(client, logged_in_user):
-    # Create admin user
-    admin = User(
-        username='admin',
-        email='admin@example.com',
-        role=Role.ADMIN
-    )
-    admin.password = 'admin123'
-    db.session.add(admin)
-    db.session.commit()
-    
-    # Login as admin
-    client.post('/login', data={
-        'username': 'admin',
-        'password': 'admin123'
-    })
-    
-    response = client.put('/api/admin/users/999999', json={
-        'username': 'updated',
-        'email': 'updated@example.com',
-        'role': Role.EMPLOYEE
-    })
-    assert response.status_code == 404
-
-def test_admin_delete_nonexistent_user(client, logged_in_user):
-    # Create admin user
-    admin = User(
-        username='admin',
-        email='admin@example.com',
-        role=Role.ADMIN
-    )
-    admin.password = 'admin123'
-    db.session.add(admin)
-    db.session.commit()
-    
-    # Login as admin
-    client.post('/login', data={
-        'username': 'admin',
-        'password': 'admin123'
-    })
-    
-    response = client.delete('/api/admin/users/999999')
-    assert response.status_code == 404
+# Admin Edge Cases (one class, so --dist=loadscope keeps them on one worker)
+class TestAdminEdges:
+    @pytest.fixture
+    def admin_client(self, client, login_as):
+        admin = User(
+            username='admin',
+            email='admin@example.com',
+            role=Role.ADMIN
+        )
+        admin.password = 'admin123'
+        db.session.add(admin)
+        db.session.commit()
+
+        login_as(admin)
+        return client
+
+    def test_admin_access_unauthorized(self, client, logged_in_user):
+        response = client.get('/api/admin/statistics')
+        assert response.status_code == 403
+
+    @pytest.mark.parametrize('method,path,payload', [
+        ('put', '/api/admin/users/999999', {
+            'username': 'updated',
+            'email': 'updated@example.com',
+            'role': Role.EMPLOYEE
+        }),
+        ('delete', '/api/admin/users/999999', None),
+    ])
+    def test_admin_nonexistent_user(self, admin_client, method, path, payload):
+        response = getattr(admin_client, method)(path, json=payload)
+        assert response.status_code == 404
 
 # Database Error Handling
-def test_database_connection_error(app, client):
-    # Simulate database connection error
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///nonexistent/path/database.db'
-    
-    with pytest.raises(Exception):
-        client.get('/')
-
-# Rate Limiting (simulated)
-def test_rate_limiting(client, logged_in_user):
-    # Simulate multiple rapid requests
-    for _ in range(11):  # Assuming rate limit is 10 requests per minute
-        response = client.get('/api/logs')
-    
+def test_database_connection_error(client, monkeypatch):
+    # Fail the connection immediately instead of pointing the shared app at
+    # an unopenable file; clear the cached probe so the check really runs
+    monkeypatch.setattr('app.api_routes._db_health', (float('-inf'), None))
+    error = OperationalError('SELECT 1', {}, Exception('unable to open database file'))
+
+    with mock.patch.object(db.engine, 'connect', side_effect=error):
+        response = client.get('/api/health')
+
+    assert response.status_code == 200
+    assert response.get_json()['database'].startswith('unhealthy')
+
+# Rate Limiting
+@pytest.fixture
+def login_limit_of_one(app, monkeypatch):
+    # The limiter is disabled in TEST_CONFIG; enable it with a budget of one
+    # login so a single primer request exhausts it
+    monkeypatch.setattr(limiter, 'enabled', True)
+    monkeypatch.setitem(app.config, 'LOGIN_RATE_LIMIT', '1 per minute')
+    yield
+    limiter.reset()
+
+def test_rate_limiting(client, login_limit_of_one):
+    credentials = {'username': 'nonexistent', 'password': 'wrongpassword'}
+    client.post('/login', data=credentials)  # Uses up the budget
+
+    response = client.post('/login', data=credentials)
     assert response.status_code == 429  # Too Many Requests
 
 # Input Validation
@@ -1,23 +1,263 @@
 import os
 import sys
-import tkinter as tk
-from tkinter import ttk, messagebox
 import subprocess
 import shutil
 from pathlib import Path
 import json
+import hashlib
 import traceback
 import logging
+import logging.handlers
+import queue
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+# tkinter is imported on first GUI use (_import_tk), so a --silent install
+# never pays for Tcl/Tk startup
+tk = ttk = messagebox = None
+
+def _import_tk():
+    global tk, ttk, messagebox
+    import tkinter as tk
+    from tkinter import ttk, messagebox
 
 # Set up logging
-logging.basicConfig(
-    filename="installer_log.txt",
-    level=logging.DEBUG,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
-
-class HRAnalyticsInstaller:
-    def __init__(self):
+# Records are queued and written to installer_log.txt by a background
+# listener thread, so install steps never block on small file writes.
+# INFO by default; --verbose adds DEBUG detail such as pip's output
+_log_file_handler = logging.FileHandler("installer_log.txt")
+_log_file_handler.setFormatter(logging.Formatter("%(asctime)s - %(levelname)s - %(message)s"))
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_file_handler)
+_log_listener.start()
+atexit.register(_log_listener.stop)  # Drains the queue before exit
+logging.getLogger().addHandler(logging.handlers.QueueHandler(_log_queue))
+logging.getLogger().setLevel(logging.INFO)
+
+# Pre-built wheels shipped next to the installer (see create_installer.bat);
+# when present, pip installs from them without touching the network
+WHEELS_DIR = "wheels"
+
+DEFAULT_INSTALL_DIR = Path.home() / "HR Analytics"
+
+REQUIREMENTS_FILE = "requirements-core.txt"
+# Written to the install folder after a successful pip run; holds
+# requirements_digest() so unchanged requirements skip pip entirely
+REQUIREMENTS_STAMP = ".requirements.sha256"
+
+def requirements_digest(requirements=REQUIREMENTS_FILE):
+    """Digest of the requirements file and the interpreter pip installs into"""
+    with open(requirements, "rb") as f:
+        return hashlib.sha256(f.read() + sys.executable.encode()).hexdigest()
+
+def pip_install_command(requirements=REQUIREMENTS_FILE, cache_dir=None):
+    command = [sys.executable, "-m", "pip", "install", "--disable-pip-version-check", "--prefer-binary"]
+    if cache_dir:
+        command += ["--cache-dir", str(cache_dir)]
+    if os.path.isdir(WHEELS_DIR):
+        command += ["--no-index", "--find-links", WHEELS_DIR, "--no-build-isolation"]
+    return command + ["-r", requirements]
+
+def requirement_count(requirements=REQUIREMENTS_FILE):
+    try:
+        with open(requirements) as f:
+            return sum(1 for line in f if line.strip() and not line.lstrip().startswith("#"))
+    except OSError:
+        return 1
+
+# Concurrent file copies; more threads only contend for the same disk
+COPY_WORKERS = 4
+
+def fast_copy(src, dst):
+    """Copy src to dst like shutil.copy2, keeping the data in the kernel where possible.
+
+    os.copy_file_range (Linux) avoids user-space buffers and can reflink on
+    btrfs/XFS; elsewhere shutil.copyfile uses its own platform fast path
+    (sendfile on Linux, fcopyfile on macOS, 1 MiB readinto on Windows).
+    """
+    copied = False
+    if hasattr(os, "copy_file_range"):
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    sent = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if sent == 0:
+                        break
+                    remaining -= sent
+            copied = remaining == 0
+        except OSError:
+            copied = False
+    if not copied:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
+def show_error(title, message, root=None):
+    """Show an error dialog, reusing a live Tk root instead of starting a new interpreter"""
+    _import_tk()
+    try:
+        alive = root is not None and bool(root.winfo_exists())
+    except tk.TclError:  # Already destroyed
+        alive = False
+    owned = None
+    if not alive:
+        root = owned = tk.Tk()
+        root.withdraw()  # Hide the main window
+    messagebox.showerror(title, message, parent=root)
+    if owned is not None:
+        owned.destroy()
+
+class InstallSteps:
+    """Install steps with no GUI dependency, shared by the Tk installer and --silent"""
+
+    def __init__(self, pip_cache_dir=None):
+        self.pip_cache_dir = pip_cache_dir
+
+    def install_dependencies(self, install_dir, on_progress=None):
+        """Run pip; on_progress(fraction) is called as packages are collected and installed."""
+        try:
+            stamp = Path(install_dir) / REQUIREMENTS_STAMP
+            digest = requirements_digest()
+            if stamp.exists() and stamp.read_text().strip() == digest:
+                logging.info("Core dependencies unchanged since last install; skipping pip")
+                return
+
+            logging.info("Installing core dependencies")
+            expected = requirement_count()
+            # Install only core requirements, streaming pip's output to the log
+            process = subprocess.Popen(
+                pip_install_command(cache_dir=self.pip_cache_dir),
+                stdout=subprocess.PIPE,
+                stderr=subprocess.STDOUT,
+                text=True,
+                bufsize=1
+            )
+            steps = 0
+            log_pip = logging.getLogger().isEnabledFor(logging.DEBUG)
+            for line in process.stdout:
+                if log_pip:
+                    logging.debug("pip: %s", line.rstrip())
+                if on_progress and line.startswith(("Collecting", "Installing")):
+                    # One "Collecting" per requirement plus the final "Installing"
+                    steps += 1
+                    on_progress(min(steps / (expected + 1), 1.0))
+            if process.wait() != 0:
+                raise subprocess.CalledProcessError(process.returncode, process.args)
+            stamp.write_text(digest)
+            logging.info("Core dependencies installed successfully")
+        except Exception as e:
+            logging.error("Failed to install dependencies: %s", e)
+            raise
+    
+    def copy_application_files(self, install_dir):
+        try:
+            logging.info("Copying application files to %s", install_dir)
+            # Copy core application files
+            files_to_copy = [
+                "activity_tracker.py",
+                "dashboard.py",
+                "analytics_engine.py",
+                "data_collection.py",
+                "config.json"
+            ]
+            
+            # One directory listing instead of a stat() per file
+            with os.scandir(".") as entries:
+                available = {entry.name for entry in entries if entry.is_file()}
+            present = []
+            for file in files_to_copy:
+                if file in available:
+                    present.append(file)
+                else:
+                    logging.warning("File not found: %s", file)
+
+            # Copying is I/O bound, so the files are copied concurrently
+            def copy(file):
+                fast_copy(file, install_dir / Path(file).name)
+                logging.info("Copied %s to %s", file, install_dir)
+
+            if present:
+                with ThreadPoolExecutor(max_workers=min(COPY_WORKERS, len(present))) as pool:
+                    list(pool.map(copy, present))
+            
+            logging.info("Application files copied successfully")
+        except Exception as e:
+            logging.error("Failed to copy application files: %s", e)
+            raise
+    
+    def configure_features(self, install_dir):
+        try:
+            logging.info("Configuring basic features")
+            # Default configuration with only core features
+            config = {
+                "core_features": True,
+                "webcam_features": False, 
+                "analytics_features": False
+            }
+            
+            # Save configuration
+            config_path = install_dir / "config.json"
+            config_path.write_text(json.dumps(config, indent=4))  # one write() call
+            
+            logging.info("Basic configuration saved to %s", config_path)
+        except Exception as e:
+            logging.error("Failed to configure features: %s", e)
+            raise
+    
+    def create_shortcut(self, install_dir):
+        try:
+            logging.info("Attempting to create desktop shortcut")
+            # Create desktop shortcut
+            desktop = Path.home() / "Desktop"
+            shortcut_path = desktop / "HR Analytics.lnk"
+            
+            try:
+                # Create Windows shortcut if winshell available
+                import winshell
+                from win32com.client import Dispatch
+                
+                shell = Dispatch('WScript.Shell')
+                shortcut = shell.CreateShortCut(str(shortcut_path))
+                shortcut.Targetpath = str(install_dir / "activity_tracker.py")
+                shortcut.WorkingDirectory = str(install_dir)
+                shortcut.save()
+                
+                logging.info("Desktop shortcut created at %s", shortcut_path)
+                return True
+            except ImportError:
+                logging.warning("Skipping shortcut creation - winshell not installed")
+                return False
+            except Exception as e:
+                logging.warning("Couldn't create shortcut: %s", e)
+                return False
+        except Exception as e:
+            logging.warning("Shortcut creation failed: %s", e)
+            return False
+
+def run_silent_install(install_dir=DEFAULT_INSTALL_DIR, pip_cache_dir=None):
+    """Headless install for automated setups; returns a process exit code"""
+    steps = InstallSteps(pip_cache_dir)
+    try:
+        install_dir = Path(install_dir)
+        install_dir.mkdir(parents=True, exist_ok=True)
+        logging.info("Created installation directory: %s", install_dir)
+        steps.install_dependencies(install_dir)
+        steps.copy_application_files(install_dir)
+        steps.configure_features(install_dir)
+        steps.create_shortcut(install_dir)
+    except Exception as e:
+        logging.error("Installation failed: %s", e)
+        logging.error(traceback.format_exc())
+        print(f"Installation failed: {e}", file=sys.stderr)
+        return 1
+    print(f"Installed to {install_dir}")
+    return 0
+
+class HRAnalyticsInstaller(InstallSteps):
+    def __init__(self, pip_cache_dir=None):
+        super().__init__(pip_cache_dir)
+        _import_tk()
         try:
             self.root = tk.Tk()
             self.root.title("HR Analytics Platform Installer")
@@ -25,7 +265,7 @@ class HRAnalyticsInstaller:
             self.setup_ui()
             logging.info("Installer UI initialized successfully")
         except Exception as e:
-            logging.error(f"Error initializing installer: {str(e)}")
+            logging.error("Error initializing installer: %s", e)
             logging.error(traceback.format_exc())
             self.show_error_and_exit(f"Failed to initialize installer: {str(e)}")
         
@@ -45,7 +285,7 @@ class HRAnalyticsInstaller:
         path_frame.grid(row=1, column=0, columnspan=2, pady=10, sticky=tk.EW)
         
         ttk.Label(path_frame, text="Install to:").pack(side=tk.LEFT)
-        self.install_path = tk.StringVar(value=str(Path.home() / "HR Analytics"))
+        self.install_path = tk.StringVar(value=str(DEFAULT_INSTALL_DIR))
         ttk.Entry(path_frame, textvariable=self.install_path, width=30).pack(side=tk.LEFT, padx=5)
         ttk.Button(path_frame, text="Browse...", command=self.browse_path).pack(side=tk.LEFT)
         
@@ -67,50 +307,64 @@ class HRAnalyticsInstaller:
         style.configure("Big.TButton", font=('Helvetica', 12, 'bold'), padding=10)
         
     def install(self):
+        self.install_button.state(['disabled'])
+        self.progress['value'] = 0
+        logging.info("Starting installation process")
+        # Run the install off the Tk thread so the window keeps repainting;
+        # progress and dialogs are marshalled back through root.after
+        install_dir = Path(self.install_path.get())
+        threading.Thread(target=self._install_worker, args=(install_dir,), daemon=True).start()
+
+    def set_progress(self, value):
+        self.root.after(0, lambda v=value: self.progress.configure(value=v))
+
+    def _install_worker(self, install_dir):
         try:
-            self.install_button.state(['disabled'])
-            self.progress['value'] = 0
-            logging.info("Starting installation process")
-            
             # Create installation directory
-            install_dir = Path(self.install_path.get())
             install_dir.mkdir(parents=True, exist_ok=True)
-            logging.info(f"Created installation directory: {install_dir}")
+            logging.info("Created installation directory: %s", install_dir)
             
-            # Install core dependencies
-            self.progress['value'] = 20
-            self.install_dependencies()
-            
-            # Copy application files
-            self.progress['value'] = 40
-            self.copy_application_files(install_dir)
+            # Install core dependencies while copying application files;
+            # the two touch different resources, so they overlap
+            self.set_progress(20)
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                copied = pool.submit(self.copy_application_files, install_dir)
+                self.install_dependencies(install_dir, lambda fraction: self.set_progress(20 + 20 * fraction))
+                self.set_progress(40)
+                copied.result()
             
             # Configure features
-            self.progress['value'] = 60
+            self.set_progress(60)
             self.configure_features(install_dir)
             
             # Attempt to create desktop shortcut
-            self.progress['value'] = 80
+            self.set_progress(80)
             shortcut_created = self.create_shortcut(install_dir)
             
-            self.progress['value'] = 100
-            if shortcut_created:
-                logging.info("Installation completed successfully with shortcut")
-                messagebox.showinfo("Success", "Installation completed successfully!\nA desktop shortcut was created.")
-            else:
-                logging.info("Installation completed successfully (no shortcut)")
-                messagebox.showinfo("Success", 
-                    "Installation completed successfully!\n\n"
-                    "Note: Could not create desktop shortcut.\n"
-                    "You can run the program from:\n"
-                    f"{install_dir / 'activity_tracker.py'}")
-            self.root.quit()
+            self.set_progress(100)
+            self.root.after(0, self._install_finished, install_dir, shortcut_created)
             
         except Exception as e:
-            logging.error(f"Installation failed: {str(e)}")
+            logging.error("Installation failed: %s", e)
             logging.error(traceback.format_exc())
-            messagebox.showerror("Error", f"Installation failed: {str(e)}\n\nPlease check the installer_log.txt file for details.")
-            self.install_button.state(['!disabled'])
+            self.root.after(0, self._install_failed, e)
+
+    def _install_finished(self, install_dir, shortcut_created):
+        if shortcut_created:
+            logging.info("Installation completed successfully with shortcut")
+            messagebox.showinfo("Success", "Installation completed successfully!\nA desktop shortcut was created.")
+        else:
+            logging.info("Installation completed successfully (no shortcut)")
+            messagebox.showinfo("Success", 
+                "Installation completed successfully!\n\n"
+                "Note: Could not create desktop shortcut.\n"
+                "You can run the program from:\n"
+                f"{install_dir / 'activity_tracker.py'}")
+        self.root.quit()
+
+    def _install_failed(self, error):
+        messagebox.showerror("Error", f"Installation failed: {str(error)}\n\nPlease check the installer_log.txt file for details.")
+        self.install_button.state(['!disabled'])
     
     def browse_path(self):
         """Let user browse for installation directory"""
@@ -122,121 +376,50 @@ class HRAnalyticsInstaller:
         if path:
             self.install_path.set(path)
 
-    def install_dependencies(self):
-        try:
-            logging.info("Installing core dependencies")
-            # Install only core requirements
-            subprocess.run([sys.executable, "-m", "pip", "install", "-r", "requirements-core.txt"], check=True)
-            logging.info("Core dependencies installed successfully")
-        except Exception as e:
-            logging.error(f"Failed to install dependencies: {str(e)}")
-            raise
-    
-    def copy_application_files(self, install_dir):
-        try:
-            logging.info(f"Copying application files to {install_dir}")
-            # Copy core application files
-            files_to_copy = [
-                "activity_tracker.py",
-                "dashboard.py",
-                "analytics_engine.py",
-                "data_collection.py",
-                "config.json"
-            ]
-            
-            for file in files_to_copy:
-                if os.path.exists(file):
-                    shutil.copy2(file, install_dir)
-                    logging.info(f"Copied {file} to {install_dir}")
-                else:
-                    logging.warning(f"File not found: {file}")
-            
-            logging.info("Application files copied successfully")
-        except Exception as e:
-            logging.error(f"Failed to copy application files: {str(e)}")
-            raise
-    
-    def configure_features(self, install_dir):
-        try:
-            logging.info("Configuring basic features")
-            # Default configuration with only core features
-            config = {
-                "core_features": True,
-                "webcam_features": False, 
-                "analytics_features": False
-            }
-            
-            # Save configuration
-            config_path = install_dir / "config.json"
-            with open(config_path, "w") as f:
-                json.dump(config, f, indent=4)
-            
-            logging.info(f"Basic configuration saved to {config_path}")
-        except Exception as e:
-            logging.error(f"Failed to configure features: {str(e)}")
-            raise
-    
-    def create_shortcut(self, install_dir):
-        try:
-            logging.info("Attempting to create desktop shortcut")
-            # Create desktop shortcut
-            desktop = Path.home() / "Desktop"
-            shortcut_path = desktop / "HR Analytics.lnk"
-            
-            try:
-                # Create Windows shortcut if winshell available
-                import winshell
-                from win32com.client import Dispatch
-                
-                shell = Dispatch('WScript.Shell')
-                shortcut = shell.CreateShortCut(str(shortcut_path))
-                shortcut.Targetpath = str(install_dir / "activity_tracker.py")
-                shortcut.WorkingDirectory = str(install_dir)
-                shortcut.save()
-                
-                logging.info(f"Desktop shortcut created at {shortcut_path}")
-                return True
-            except ImportError:
-                logging.warning("Skipping shortcut creation - winshell not installed")
-                return False
-            except Exception as e:
-                logging.warning(f"Couldn't create shortcut: {str(e)}")
-                return False
-        except Exception as e:
-            logging.warning(f"Shortcut creation failed: {str(e)}")
-            return False
-    
     def show_error_and_exit(self, error_message):
         """Show error message and keep window open until user clicks OK"""
-        root = tk.Tk()
-        root.withdraw()  # Hide the main window
-        messagebox.showerror("Error", error_message)
-        root.destroy()
+        show_error("Error", error_message, getattr(self, 'root', None))
         sys.exit(1)
     
     def run(self):
         try:
             self.root.mainloop()
         except Exception as e:
-            logging.error(f"Error in main loop: {str(e)}")
+            logging.error("Error in main loop: %s", e)
             logging.error(traceback.format_exc())
             self.show_error_and_exit(f"An error occurred: {str(e)}")
 
 if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="HR Analytics Platform Installer")
+    parser.add_argument("--silent", action="store_true",
+                        help="install without the GUI")
+    parser.add_argument("--install-dir", default=str(DEFAULT_INSTALL_DIR),
+                        help="installation folder for --silent")
+    parser.add_argument("--cache-dir",
+                        help="pip cache folder (e.g. a CI cache) to reuse across installs")
+    parser.add_argument("--verbose", action="store_true",
+                        help="write debug detail to installer_log.txt")
+    args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    if args.silent:
+        sys.exit(run_silent_install(args.install_dir, args.cache_dir))
+
+    installer = None
     try:
         # Add a try-except block around the entire program
-        installer = HRAnalyticsInstaller()
+        installer = HRAnalyticsInstaller(args.cache_dir)
         installer.run()
     except Exception as e:
         # Log the error and show a message box
-        logging.error(f"Unhandled exception: {str(e)}")
+        logging.error("Unhandled exception: %s", e)
         logging.error(traceback.format_exc())
         
-        # Create a simple error window that won't close immediately
-        root = tk.Tk()
-        root.withdraw()  # Hide the main window
-        messagebox.showerror("Critical Error", 
-                            f"An unexpected error occurred: {str(e)}\n\n"
-                            "Please check the installer_log.txt file for details.\n\n"
-                            "Click OK to exit.")
-        root.destroy() 
\ No newline at end of file
+        # Show a simple error window that won't close immediately
+        show_error("Critical Error",
+                   f"An unexpected error occurred: {str(e)}\n\n"
+                   "Please check the installer_log.txt file for details.\n\n"
+                   "Click OK to exit.",
+                   getattr(installer, 'root', None)) 
\ No newline at end of file
@@ -2,6 +2,7 @@ import os
 import sys
 import tkinter as tk
 from tkinter import ttk, messagebox
+from tkinter.scrolledtext import ScrolledText
 import subprocess
 import shutil
 from pathlib import Path
@@ -10,6 +11,8 @@ import traceback
 import logging
 import argparse
 
+from file_utils import tail_lines
+
 # Set up logging with more detailed information
 logging.basicConfig(
     filename="installer_debug.log",
@@ -17,31 +20,54 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - [%(filename)s:%(lineno)d] - %(message)s'
 )
 
-def show_error_window(title, message):
-    """Show an error message in a window that won't close immediately"""
-    root = tk.Tk()
-    root.title(title)
-    root.geometry("600x400")
+def tail_log(path="installer_debug.log", lines=10):
+    """Return the last few lines of the log"""
+    if not os.path.exists(path):
+        return []
+    return tail_lines(path, lines)
+
+def show_error_window(title, message, parent=None):
+    """Show an error message with recent log entries.
+
+    With a live parent window the details open in a Toplevel on its Tk
+    interpreter; otherwise a plain error dialog is shown.
+    """
+    log_lines = tail_log()
+    
+    if parent is None:
+        details = message
+        if log_lines:
+            details += "\n\nRecent log entries:\n\n" + "\n".join(log_lines)
+        root = tk.Tk()
+        root.withdraw()  # Only the dialog should appear
+        messagebox.showerror(title, details, parent=root)
+        root.destroy()
+        return
     
-    frame = ttk.Frame(root, padding="20")
+    window = tk.Toplevel(parent)
+    window.title(title)
+    window.geometry("600x400")
+    window.transient(parent)
+    
+    frame = ttk.Frame(window, padding="20")
     frame.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
     
     # Error message
     ttk.Label(frame, text=message, wraplength=500).grid(row=0, column=0, pady=20)
     
     # Show the last few lines of the log file
-    if os.path.exists("installer_debug.log"):
-        with open("installer_debug.log", "r") as f:
-            log_contents = f.readlines()[-10:]  # Last 10 lines
-        log_text = tk.Text(frame, height=10, width=70)
+    if log_lines:
+        log_text = ScrolledText(frame, height=10, width=70)
         log_text.grid(row=1, column=0, pady=10)
-        log_text.insert(tk.END, "Recent log entries:\n\n" + "".join(log_contents))
+        log_text.insert(tk.END, "Recent log entries:\n\n" + "\n".join(log_lines))
         log_text.config(state='disabled')
     
     # Close button
-    ttk.Button(frame, text="Close", command=root.destroy).grid(row=2, column=0, pady=20)
+    ttk.Button(frame, text="Close", command=window.destroy).grid(row=2, column=0, pady=20)
     
-    root.mainloop()
+    # Block the caller like the old window did, without a second mainloop
+    window.grab_set()
+    parent.wait_window(window)
 
 class HRAnalyticsInstaller:
     def __init__(self, debug_mode=False):
@@ -157,7 +183,8 @@ class HRAnalyticsInstaller:
             logging.error("Traceback: %s", traceback.format_exc())
             show_error_window("Installation Error", 
                             f"Installation failed:\n\n{str(e)}\n\n"
-                            "Please check installer_debug.log for details.")
+                            "Please check installer_debug.log for details.",
+                            parent=self.root)
             self.install_button.state(['!disabled'])
     
     def install_dependencies(self):
@@ -182,8 +209,12 @@ class HRAnalyticsInstaller:
                 "config.json"
             ]
             
+            # One directory listing instead of a stat() per file
+            with os.scandir(".") as entries:
+                available = {entry.name for entry in entries if entry.is_file()}
+            
             for file in files_to_copy:
-                if os.path.exists(file):
+                if file in available:
                     shutil.copy2(file, install_dir)
                     logging.info("Copied %s to %s", file, install_dir)
                 else:
@@ -191,7 +222,8 @@ class HRAnalyticsInstaller:
                     if self.debug_mode:
                         show_error_window("Missing File", 
                                         f"Warning: Could not find file: {file}\n"
-                                        "The installation will continue, but some features may not work.")
+                                        "The installation will continue, but some features may not work.",
+                                        parent=self.root)
         except Exception as e:
             logging.error("Failed to copy files: %s", str(e))
             raise
@@ -234,7 +266,8 @@ class HRAnalyticsInstaller:
             if self.debug_mode:
                 show_error_window("Shortcut Creation Error", 
                                 "Could not create desktop shortcut due to missing modules.\n"
-                                "The application is installed but you'll need to create a shortcut manually.")
+                                "The application is installed but you'll need to create a shortcut manually.",
+                                parent=self.root)
         except Exception as e:
             logging.error("Failed to create shortcut: %s", str(e))
             raise
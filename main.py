@@ -1,5 +1,7 @@
 import json
-import time
+import os
+import signal
+import threading
 import logging
 from webcam_integration import WebcamIntegration
 from hid_system_integration import HIDSystemIntegration
@@ -14,8 +16,9 @@ logger = logging.getLogger(__name__)
 class MultimodalIntegration:
     def __init__(self, config_path='config.json'):
         self.config = self._load_config(config_path)
-        self.webcam = WebcamIntegration(config_path)
-        self.hid_system = HIDSystemIntegration(config_path)
+        # Share the parsed config rather than having each reread the file
+        self.webcam = WebcamIntegration(config_path, config=self.config)
+        self.hid_system = HIDSystemIntegration(config_path, config=self.config)
         self.is_running = False
         
     def _load_config(self, config_path):
@@ -73,22 +76,35 @@ class MultimodalIntegration:
             logger.error(f"Error stopping multimodal integration: {e}")
             raise
 
+# Windows can't interrupt a blocked lock wait, so wake periodically there to
+# let the Ctrl+C handler run; elsewhere block until a signal arrives
+STOP_POLL_SECONDS = 1 if os.name == 'nt' else None
+
 def main():
+    integration = None
+    stop_event = threading.Event()
+    
+    def request_stop(signum, frame):
+        logger.info(f"Received signal {signum}, stopping...")
+        stop_event.set()
+        
+    signal.signal(signal.SIGINT, request_stop)
+    signal.signal(signal.SIGTERM, request_stop)
+    
     try:
         # Initialize and start the multimodal integration
         integration = MultimodalIntegration()
         integration.start()
         
-        # Keep the main thread alive
-        while True:
-            time.sleep(1)
+        # Keep the main thread alive until SIGINT/SIGTERM
+        while not stop_event.wait(STOP_POLL_SECONDS):
+            pass
             
-    except KeyboardInterrupt:
-        logger.info("Received keyboard interrupt, stopping...")
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
     finally:
-        integration.stop()
+        if integration is not None:
+            integration.stop()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
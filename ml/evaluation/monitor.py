@@ -4,13 +4,23 @@ monitor.py
 Tracks model performance metrics over time and alerts on degradation.
 """
 
+import collections
+import csv
 import os
-import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Plots are only saved to files; skip loading a GUI toolkit
 import matplotlib.pyplot as plt
 from datetime import datetime
 import numpy as np
 from sklearn.metrics import accuracy_score, f1_score
-from screenshot_classifier import classify_screenshot
+from screenshot_classifier import classify_batch
+from file_utils import tail_lines
+
+# plot_performance_trends labels at most this many timestamps per axis
+MAX_XTICKS = 20
+
+# check_for_drift compares the last 3 evaluations with the 3 before the newest
+DRIFT_WINDOW = 3
 
 class ModelMonitor:
     def __init__(self):
@@ -18,34 +28,62 @@ class ModelMonitor:
         self.drift_threshold = 0.05  # 5% performance drop
         os.makedirs('reports', exist_ok=True)
         
-        # Initialize metrics file if it doesn't exist
-        if not os.path.exists(self.metrics_file):
-            pd.DataFrame(columns=[
+        # (accuracy, f1_score) of the latest evaluations, enough for drift checks
+        self._recent = collections.deque(maxlen=DRIFT_WINDOW + 1)
+        if os.path.exists(self.metrics_file):
+            # Only the last few rows matter, however long the history grows
+            lines = tail_lines(self.metrics_file, self._recent.maxlen + 1)
+            for row in csv.reader(lines):
+                if row and row[0] != 'timestamp':
+                    self._recent.append((float(row[1]), float(row[2])))
+        
+        # Trend figure, created on first plot and redrawn in place after that
+        self._fig = None
+        self._axes = None
+        
+        # Keep one append handle open instead of reopening per batch
+        new_file = not os.path.exists(self.metrics_file)
+        self._fp = open(self.metrics_file, 'a', newline='')
+        self._writer = csv.writer(self._fp)
+        if new_file:
+            self._writer.writerow([
                 'timestamp',
                 'accuracy',
                 'f1_score',
                 'num_samples',
                 'version'
-            ]).to_csv(self.metrics_file, index=False)
+            ])
+            self._fp.flush()
+
+    def close(self):
+        """Close the metrics file and trend figure"""
+        self._fp.close()
+        if self._fig is not None:
+            plt.close(self._fig)
+            self._fig = None
 
     def evaluate_batch(self, images, labels, model_version):
         """Evaluate model on a batch of new data"""
-        preds = [classify_screenshot(img) for img in images]
+        # One batched forward pass instead of a predict() call per image
+        results = classify_batch(images)
+        if len(results) != len(images):
+            raise ValueError("Some images in the batch could not be loaded")
+        preds = [pred_class for _, pred_class, _ in results]
         
         # Calculate metrics
         accuracy = accuracy_score(labels, preds)
         f1 = f1_score(labels, preds, average='weighted')
         
         # Save metrics
-        new_row = pd.DataFrame([{
-            'timestamp': datetime.now().isoformat(),
-            'accuracy': accuracy,
-            'f1_score': f1,
-            'num_samples': len(images),
-            'version': model_version
-        }])
-        
-        new_row.to_csv(self.metrics_file, mode='a', header=False, index=False)
+        self._writer.writerow([
+            datetime.now().isoformat(),
+            accuracy,
+            f1,
+            len(images),
+            model_version
+        ])
+        self._fp.flush()
+        self._recent.append((accuracy, f1))
         
         # Check for performance drift
         self.check_for_drift()
@@ -54,20 +92,19 @@ class ModelMonitor:
 
     def check_for_drift(self):
         """Check if model performance has degraded significantly"""
-        df = pd.read_csv(self.metrics_file)
-        if len(df) < 2:
+        rows = list(self._recent)
+        if len(rows) < 2:
             return False
             
         # Get rolling average of last 3 evaluations
-        recent = df.tail(3)
-        baseline = df.iloc[-4:-1] if len(df) >=4 else df.head(3)
+        recent = rows[-DRIFT_WINDOW:]
+        baseline = rows[:DRIFT_WINDOW]
         
-        recent_avg = recent[['accuracy', 'f1_score']].mean()
-        baseline_avg = baseline[['accuracy', 'f1_score']].mean()
+        recent_avg = np.mean(recent, axis=0)
+        baseline_avg = np.mean(baseline, axis=0)
         
         # Calculate performance drop
-        accuracy_drop = baseline_avg['accuracy'] - recent_avg['accuracy']
-        f1_drop = baseline_avg['f1_score'] - recent_avg['f1_score']
+        accuracy_drop, f1_drop = baseline_avg - recent_avg
         
         if accuracy_drop > self.drift_threshold or f1_drop > self.drift_threshold:
             self.alert_performance_drop(accuracy_drop, f1_drop)
@@ -83,30 +120,37 @@ class ModelMonitor:
 
     def plot_performance_trends(self):
         """Generate performance trend visualization"""
+        # Only plotting needs pandas; keep it off the evaluation path
+        import pandas as pd
+        
         df = pd.read_csv(self.metrics_file)
         if len(df) < 2:
             print("Not enough data to plot trends")
             return
             
-        plt.figure(figsize=(12, 6))
+        if self._fig is None:
+            self._fig, self._axes = plt.subplots(1, 2, figsize=(12, 6))
         
-        # Plot accuracy
-        plt.subplot(1, 2, 1)
-        plt.plot(df['timestamp'], df['accuracy'], label='Accuracy')
-        plt.title('Accuracy Over Time')
-        plt.xticks(rotation=45)
-        plt.ylim(0, 1)
+        # Label a subsample of timestamps; hundreds of overlapping tick labels
+        # would dominate the render time
+        step = max(1, len(df) // MAX_XTICKS)
+        tick_positions = range(0, len(df), step)
+        tick_labels = df['timestamp'][::step]
         
-        # Plot F1 score
-        plt.subplot(1, 2, 2)
-        plt.plot(df['timestamp'], df['f1_score'], label='F1 Score', color='orange')
-        plt.title('F1 Score Over Time')
-        plt.xticks(rotation=45)
-        plt.ylim(0, 1)
+        panels = [
+            ('accuracy', 'Accuracy', 'Accuracy Over Time', None),
+            ('f1_score', 'F1 Score', 'F1 Score Over Time', 'orange'),
+        ]
+        for ax, (column, label, title, color) in zip(self._axes, panels):
+            ax.clear()
+            ax.plot(df['timestamp'], df[column], label=label, color=color)
+            ax.set_title(title)
+            ax.set_xticks(tick_positions)
+            ax.set_xticklabels(tick_labels, rotation=45)
+            ax.set_ylim(0, 1)
         
-        plt.tight_layout()
-        plt.savefig('reports/performance_trends.png')
-        plt.close()
+        self._fig.tight_layout()
+        self._fig.savefig('reports/performance_trends.png')
 
 if __name__ == '__main__':
     # Example usage
@@ -120,3 +164,4 @@ if __name__ == '__main__':
     print(f"Batch evaluation - Accuracy: {accuracy:.2%}, F1: {f1:.2%}")
     
     monitor.plot_performance_trends()
+    monitor.close()
@@ -1,5 +1,8 @@
+import hashlib
 import os
+import re
 import shutil
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 # Source and destination paths
@@ -7,30 +10,59 @@ src_dir = 'ActiveWindowScreenshots'
 train_dir = 'data/train'
 val_dir = 'data/validation'
 
+# Copies are I/O bound, so threads overlap the syscalls
+COPY_WORKERS = 16
+
+# Window-title keywords per category; code keywords win when both match
+CODE_PATTERN = re.compile(r'python|cmd|code', re.IGNORECASE)
+WEB_PATTERN = re.compile(r'edge|copilot|chrome', re.IGNORECASE)
+
 # Create category folders if they don't exist
 for category in ['code', 'document', 'web']:
     os.makedirs(f'{train_dir}/{category}', exist_ok=True)
     os.makedirs(f'{val_dir}/{category}', exist_ok=True)
 
+def split_dir(filename):
+    """Stable 80/20 train/validation assignment for a screenshot.
+
+    hash() is salted per process, so use a digest that keeps each file on the
+    same side across runs.
+    """
+    in_train = hashlib.blake2b(filename.encode(), digest_size=1).digest()[0] < 205
+    return train_dir if in_train else val_dir
+
+def is_up_to_date(src, dest):
+    """True if dest is a copy of src made after src last changed"""
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        return False
+    src_stat = os.stat(src)
+    return dest_stat.st_size == src_stat.st_size and dest_stat.st_mtime >= src_stat.st_mtime
+
 def categorize_and_copy(filename):
     """Categorize screenshot and copy to appropriate folder"""
-    lower_name = filename.lower()
-    
     # Determine category
-    if 'python' in lower_name or 'cmd' in lower_name or 'code' in lower_name:
+    if CODE_PATTERN.search(filename):
         category = 'code'
-    elif 'edge' in lower_name or 'copilot' in lower_name or 'chrome' in lower_name:
+    elif WEB_PATTERN.search(filename):
         category = 'web'
     else:
         category = 'document'  # Default for file explorer, notepad etc.
     
-    # Split into train/validation (80/20)
-    dest_dir = train_dir if hash(filename) % 10 < 8 else val_dir
-    shutil.copy2(f'{src_dir}/{filename}', f'{dest_dir}/{category}/{filename}')
+    # Split into train/validation (80/20); reruns skip files already copied
+    src = f'{src_dir}/{filename}'
+    dest = f'{split_dir(filename)}/{category}/{filename}'
+    if not is_up_to_date(src, dest):
+        shutil.copyfile(src, dest)
 
 # Process all screenshots
-for filename in os.listdir(src_dir):
-    if filename.endswith('.png'):
-        categorize_and_copy(filename)
+screenshots = [
+    entry.name for entry in os.scandir(src_dir)
+    if entry.name.endswith('.png') and entry.is_file()
+]
+with ThreadPoolExecutor(max_workers=COPY_WORKERS) as executor:
+    # Consume the results so a failed copy raises here
+    list(executor.map(categorize_and_copy, screenshots))
 
 print(f"Copied screenshots to {train_dir} and {val_dir}")
@@ -0,0 +1,37 @@
+"""
+convert_to_onnx.py
+
+One-time export of the trained screenshot classifier to ONNX, specialised for
+the single-image (1, 224, 224, 3) input classify_screenshot sends. Requires
+tf2onnx here and onnxruntime wherever the classifier runs.
+"""
+
+import os
+import tensorflow as tf
+import tf2onnx
+from convert_to_tflite import load_float32_model
+
+# Configuration
+ONNX_MODEL_PATH = 'models/screenshot_classifier.onnx'
+ONNX_OPSET = 17
+
+img_height = 224
+img_width = 224
+
+def convert():
+    model = load_float32_model()
+
+    # A fixed shape lets ONNX Runtime plan every buffer ahead of time
+    input_signature = (tf.TensorSpec((1, img_height, img_width, 3), tf.float32, name='input'),)
+
+    os.makedirs(os.path.dirname(ONNX_MODEL_PATH), exist_ok=True)
+    tf2onnx.convert.from_keras(
+        model,
+        input_signature=input_signature,
+        opset=ONNX_OPSET,
+        output_path=ONNX_MODEL_PATH
+    )
+    print(f"ONNX model saved to {ONNX_MODEL_PATH}")
+
+if __name__ == '__main__':
+    convert()
@@ -0,0 +1,74 @@
+"""
+convert_to_tflite.py
+
+One-time conversion of the trained screenshot classifier to an int8-quantized
+TFLite model. classify_screenshot and classify_batch pick it up automatically
+once it exists.
+"""
+
+import os
+import tensorflow as tf
+from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
+
+# Configuration
+KERAS_MODEL_PATH = 'models/screenshot_classifier_final.keras'
+TFLITE_MODEL_PATH = 'models/screenshot_classifier.int8.tflite'
+CALIBRATION_DIR = 'data/validation'
+CALIBRATION_SAMPLES = 200
+
+img_height = 224
+img_width = 224
+
+def representative_dataset():
+    """Yield preprocessed single images for calibrating int8 activation ranges"""
+    ds = tf.keras.utils.image_dataset_from_directory(
+        CALIBRATION_DIR,
+        image_size=(img_height, img_width),
+        batch_size=1,
+        label_mode=None,
+        shuffle=True
+    )
+    for image in ds.take(CALIBRATION_SAMPLES):
+        yield [preprocess_input(tf.cast(image, tf.float32))]
+
+def _float32_config(config):
+    """Copy of a Keras model config with every mixed-precision dtype policy set to float32"""
+    if isinstance(config, dict):
+        return {
+            key: 'float32' if key == 'dtype' and isinstance(value, dict) else _float32_config(value)
+            for key, value in config.items()
+        }
+    if isinstance(config, list):
+        return [_float32_config(item) for item in config]
+    return config
+
+def load_float32_model(path=KERAS_MODEL_PATH):
+    """Load the trained classifier with float32 compute.
+
+    Training may run under a mixed float16/bfloat16 policy, which exporters
+    would carry over as casts. Variables are float32 either way, so the
+    weights transfer unchanged.
+    """
+    # The focal loss is only needed for training
+    trained = tf.keras.models.load_model(path, compile=False)
+    model = tf.keras.Model.from_config(_float32_config(trained.get_config()))
+    model.set_weights(trained.get_weights())
+    return model
+
+def convert():
+    model = load_float32_model()
+
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    # Integer-only kernels; input and output stay float32 so callers pass
+    # the same preprocessed arrays as they would to the Keras model
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+
+    os.makedirs(os.path.dirname(TFLITE_MODEL_PATH), exist_ok=True)
+    with open(TFLITE_MODEL_PATH, 'wb') as f:
+        f.write(converter.convert())
+    print(f"Quantized model saved to {TFLITE_MODEL_PATH}")
+
+if __name__ == '__main__':
+    convert()
@@ -10,9 +10,14 @@ from tensorflow.keras.models import Model
 from tensorflow.keras.layers import Dense, GlobalAveragePooling2D
 from tensorflow.keras.applications import MobileNetV2
 from tensorflow.keras.applications.mobilenet_v2 import preprocess_input
-from tensorflow.keras.preprocessing.image import ImageDataGenerator, load_img, img_to_array
 import numpy as np
 import os
+import threading
+
+# Mixed precision: float16 on GPU tensor cores, bfloat16 on CPU. Variables
+# stay float32; only activations and matmuls drop precision.
+MIXED_PRECISION_POLICY = 'mixed_float16' if tf.config.list_physical_devices('GPU') else 'mixed_bfloat16'
+tf.keras.mixed_precision.set_global_policy(MIXED_PRECISION_POLICY)
 
 # ------- Configuration -------
 train_dir = 'data/train'         # Training data directory
@@ -23,36 +28,51 @@ img_width = 224
 batch_size = 32
 num_classes = 3                  # E.g., code, document, web
 
-# ------- Data Generators -------
-# Enhanced augmentation with minority class focus
-train_datagen = ImageDataGenerator(
-    preprocessing_function=preprocess_input,
-    rotation_range=40,
-    zoom_range=0.3,
-    width_shift_range=0.3,
-    height_shift_range=0.3,
-    shear_range=0.2,
-    horizontal_flip=True,
-    vertical_flip=True,
-    fill_mode="reflect"
-)
-
-val_datagen = ImageDataGenerator(
-    preprocessing_function=preprocess_input
-)
+# ------- Input Pipelines -------
+# tf.data decodes and augments in TensorFlow's thread pool, overlapping with
+# the training step instead of blocking on single-threaded PIL decoding
+AUTOTUNE = tf.data.AUTOTUNE
 
-train_generator = train_datagen.flow_from_directory(
+train_ds = tf.keras.utils.image_dataset_from_directory(
     train_dir,
-    target_size=(img_height, img_width),
+    image_size=(img_height, img_width),
     batch_size=batch_size,
-    class_mode='categorical'
+    label_mode='categorical'
 )
 
-val_generator = val_datagen.flow_from_directory(
+# Unshuffled so evaluate_model can line predictions up with the labels
+val_ds = tf.keras.utils.image_dataset_from_directory(
     val_dir,
-    target_size=(img_height, img_width),
+    image_size=(img_height, img_width),
     batch_size=batch_size,
-    class_mode='categorical'
+    label_mode='categorical',
+    shuffle=False
+)
+
+# Sorted subdirectory names; index i is the model's output unit i
+class_names = train_ds.class_names
+
+# Enhanced augmentation with minority class focus
+augment = tf.keras.Sequential([
+    tf.keras.layers.RandomFlip('horizontal_and_vertical'),
+    tf.keras.layers.RandomRotation(40 / 360, fill_mode='reflect'),
+    tf.keras.layers.RandomZoom(0.3, fill_mode='reflect'),
+    tf.keras.layers.RandomTranslation(0.3, 0.3, fill_mode='reflect'),
+])
+
+# Cache the decoded images, then augment fresh on every epoch
+train_ds = (
+    train_ds.cache()
+    .shuffle(1024)
+    .map(lambda x, y: (preprocess_input(augment(x, training=True)), y),
+         num_parallel_calls=AUTOTUNE)
+    .prefetch(AUTOTUNE)
+)
+
+val_ds = (
+    val_ds.map(lambda x, y: (preprocess_input(x), y), num_parallel_calls=AUTOTUNE)
+    .cache()
+    .prefetch(AUTOTUNE)
 )
 
 # ------- Build the Model -------
@@ -63,17 +83,28 @@ base_model = MobileNetV2(weights='imagenet', include_top=False, input_shape=(img
 for layer in base_model.layers:
     layer.trainable = False
 
+# Pooled backbone features; while the base is frozen these never change
+features = GlobalAveragePooling2D()(base_model.output)
+feature_extractor = Model(inputs=base_model.input, outputs=features)
+
 # Add custom classification layers on top.
-x = base_model.output
-x = GlobalAveragePooling2D()(x)
-x = Dense(128, activation='relu')(x)
-predictions = Dense(num_classes, activation='softmax')(x)
+head = tf.keras.Sequential([
+    tf.keras.Input(shape=(base_model.output_shape[-1],)),
+    Dense(128, activation='relu'),
+    # Softmax output in float32 so the focal loss sees full-precision probabilities
+    Dense(num_classes, activation='softmax', dtype='float32'),
+])
 
-model = Model(inputs=base_model.input, outputs=predictions)
+# The head's layers are shared, so training head alone also trains model
+model = Model(inputs=base_model.input, outputs=head(features))
 # Focal loss implementation
 def focal_loss(gamma=2., alpha=0.25):
     def focal_loss_fixed(y_true, y_pred):
-        pt = tf.where(tf.equal(y_true, 1), y_pred, 1-y_pred)
+        # pt is y_pred for the true class and 1 - y_pred elsewhere, written as
+        # one pointwise expression so XLA fuses the whole loss into one kernel
+        y_true = tf.cast(y_true, y_pred.dtype)
+        pt = y_true * y_pred + (1. - y_true) * (1. - y_pred)
+        pt = tf.clip_by_value(pt, 1e-7, 1.)
         return -tf.reduce_mean(alpha * tf.pow(1. - pt, gamma) * tf.math.log(pt))
     return focal_loss_fixed
 
@@ -84,37 +115,70 @@ class_weights = {
     2: 11.0  # web
 }
 
+def make_optimizer():
+    optimizer = tf.keras.optimizers.Adam(learning_rate=1e-4)
+    if MIXED_PRECISION_POLICY == 'mixed_float16':
+        # float16 gradients underflow without loss scaling; bfloat16 has float32's range
+        optimizer = tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+    return optimizer
+
+# The full model is compiled for fine-tuning with an unfrozen base.
+# jit_compile has XLA fuse each train step, e.g. MobileNetV2's
+# depthwise conv + BN + ReLU6 chains, instead of launching every op.
 model.compile(
-    optimizer=tf.keras.optimizers.Adam(learning_rate=1e-4),
+    optimizer=make_optimizer(),
     loss=focal_loss(),
-    metrics=['accuracy']
+    metrics=['accuracy'],
+    jit_compile=True
+)
+head.compile(
+    optimizer=make_optimizer(),
+    loss=focal_loss(),
+    metrics=['accuracy'],
+    jit_compile=True
 )
 model.summary()
 
+# ------- Feature Extraction -------
+# Augmented views of each training image to extract; still far fewer
+# backbone passes than one per epoch
+feature_passes = 3
+
+def extract_features(dataset, passes=1):
+    """Run the frozen backbone over dataset, returning (features, labels) arrays"""
+    feats, labels = [], []
+    for _ in range(passes):
+        # Each pass over train_ds draws fresh augmentations
+        for images, batch_labels in dataset:
+            feats.append(feature_extractor(images, training=False).numpy())
+            labels.append(batch_labels.numpy())
+    return np.concatenate(feats), np.concatenate(labels)
+
+train_feats, train_labels = extract_features(train_ds, passes=feature_passes)
+val_feats, val_labels = extract_features(val_ds)
+
 # ------- Callbacks -------
-from tensorflow.keras.callbacks import TensorBoard, ModelCheckpoint, EarlyStopping
+from tensorflow.keras.callbacks import TensorBoard, EarlyStopping
 from datetime import datetime
 
 log_dir = "logs/fit/" + datetime.now().strftime("%Y%m%d-%H%M%S")
 tensorboard_callback = TensorBoard(log_dir=log_dir, histogram_freq=1)
-checkpoint_callback = ModelCheckpoint(
-    filepath='models/screenshot_classifier_{epoch:02d}.keras',
-    save_best_only=True,
-    monitor='val_accuracy',
-    mode='max'
-)
-early_stopping = EarlyStopping(monitor='val_loss', patience=3)
+# Checkpoints of the head alone aren't loadable classifiers; keep the best
+# weights in memory and save the full model below instead
+early_stopping = EarlyStopping(monitor='val_loss', patience=3, restore_best_weights=True)
 
 # ------- Train the Model -------
+# Only the head trains here, against the cached backbone features
 epochs = 20  # Increased epochs with early stopping
-history = model.fit(
-    train_generator,
-    steps_per_epoch=train_generator.samples // batch_size,
-    validation_data=val_generator,
-    validation_steps=val_generator.samples // batch_size,
+history = head.fit(
+    train_feats,
+    train_labels,
+    batch_size=batch_size,
+    shuffle=True,
+    validation_data=(val_feats, val_labels),
     epochs=epochs,
     class_weight=class_weights,
-    callbacks=[tensorboard_callback, checkpoint_callback, early_stopping]
+    callbacks=[tensorboard_callback, early_stopping]
 )
 
 # Save the final trained model.
@@ -127,22 +191,26 @@ import seaborn as sns
 import matplotlib.pyplot as plt
 import pandas as pd
 
-def evaluate_model(model, generator):
+def evaluate_model(model, dataset):
     """Generate comprehensive evaluation metrics"""
-    # Get true labels and predictions
-    y_true = generator.classes
-    y_pred = model.predict(generator).argmax(axis=1)
+    # Get true labels and predictions in one pass over the dataset
+    y_true, y_pred = [], []
+    for images, labels in dataset:
+        y_true.append(labels.numpy().argmax(axis=1))
+        y_pred.append(model(images, training=False).numpy().argmax(axis=1))
+    y_true = np.concatenate(y_true)
+    y_pred = np.concatenate(y_pred)
     
     # Classification report
     print("Classification Report:")
-    print(classification_report(y_true, y_pred, target_names=generator.class_indices.keys()))
+    print(classification_report(y_true, y_pred, target_names=class_names))
     
     # Confusion matrix
     cm = confusion_matrix(y_true, y_pred)
     plt.figure(figsize=(8,6))
     sns.heatmap(cm, annot=True, fmt='d', 
-                xticklabels=generator.class_indices.keys(),
-                yticklabels=generator.class_indices.keys())
+                xticklabels=class_names,
+                yticklabels=class_names)
     plt.xlabel('Predicted')
     plt.ylabel('True')
     plt.title('Confusion Matrix')
@@ -151,7 +219,7 @@ def evaluate_model(model, generator):
     
     # Save metrics to CSV
     report = classification_report(y_true, y_pred, 
-                                 target_names=generator.class_indices.keys(),
+                                 target_names=class_names,
                                  output_dict=True)
     pd.DataFrame(report).transpose().to_csv('reports/classification_metrics.csv')
 
@@ -160,9 +228,88 @@ os.makedirs('reports', exist_ok=True)
 
 # Evaluate on validation set
 print("\nValidation Set Evaluation:")
-evaluate_model(model, val_generator)
+evaluate_model(model, val_ds)
 
 # ------- Inference Function -------
+# Written by convert_to_tflite.py and convert_to_onnx.py; inference falls
+# back to the Keras model until they exist
+TFLITE_MODEL_PATH = 'models/screenshot_classifier.int8.tflite'
+ONNX_MODEL_PATH = 'models/screenshot_classifier.onnx'
+inference_batch_size = 64
+_interpreter = None
+_interpreter_lock = threading.Lock()
+# None until first use; False once ONNX Runtime or the model is found missing
+_onnx_session = None
+_onnx_output = np.empty((1, num_classes), dtype=np.float32)
+
+def _get_onnx_session():
+    """Create the single-image ONNX Runtime session once, or return None if unavailable."""
+    global _onnx_session
+    if _onnx_session is None:
+        _onnx_session = False
+        if os.path.exists(ONNX_MODEL_PATH):
+            try:
+                import onnxruntime as ort
+            except ImportError:
+                return None
+            options = ort.SessionOptions()
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            _onnx_session = ort.InferenceSession(
+                ONNX_MODEL_PATH,
+                sess_options=options,
+                providers=['CPUExecutionProvider']
+            )
+    return _onnx_session or None
+
+def _predict_onnx(session, image):
+    """Run one (1, height, width, 3) image through ONNX Runtime into _onnx_output."""
+    binding = session.io_binding()
+    binding.bind_cpu_input(session.get_inputs()[0].name, np.ascontiguousarray(image))
+    binding.bind_output(
+        session.get_outputs()[0].name, 'cpu', 0,
+        np.float32, _onnx_output.shape, _onnx_output.ctypes.data
+    )
+    session.run_with_iobinding(binding)
+    return _onnx_output.copy()
+
+@tf.function(input_signature=[tf.TensorSpec([None, img_height, img_width, 3], tf.float32)])
+def _infer(images):
+    """Keras fallback; the batch-agnostic signature traces one graph for every call"""
+    return model(images, training=False)
+
+def _get_interpreter():
+    """Load the int8 TFLite model once, or return None if it hasn't been converted."""
+    global _interpreter
+    if _interpreter is None and os.path.exists(TFLITE_MODEL_PATH):
+        _interpreter = tf.lite.Interpreter(model_path=TFLITE_MODEL_PATH, num_threads=os.cpu_count())
+        _interpreter.allocate_tensors()
+    return _interpreter
+
+def _predict(batch):
+    """Class probabilities for a preprocessed (N, height, width, 3) float32 batch."""
+    with _interpreter_lock:
+        # The ONNX export is specialised for a single image
+        if batch.shape[0] == 1:
+            session = _get_onnx_session()
+            if session is not None:
+                return _predict_onnx(session, batch)
+                
+        interpreter = _get_interpreter()
+        if interpreter is None:
+            return np.concatenate([
+                _infer(tf.constant(batch[i:i + inference_batch_size])).numpy()
+                for i in range(0, len(batch), inference_batch_size)
+            ])
+        
+        input_details = interpreter.get_input_details()[0]
+        if tuple(input_details['shape']) != batch.shape:
+            interpreter.resize_tensor_input(input_details['index'], batch.shape)
+            interpreter.allocate_tensors()
+        interpreter.set_tensor(input_details['index'], batch)
+        interpreter.invoke()
+        # Copy out; the interpreter reuses its output buffer on the next invoke
+        return interpreter.get_tensor(interpreter.get_output_details()[0]['index']).copy()
+
 def classify_screenshot(image_path, return_confidence=False):
     """
     Classify a screenshot and optionally return confidence scores.
@@ -172,22 +319,25 @@ def classify_screenshot(image_path, return_confidence=False):
     Returns:
         Predicted class or (class, confidence) if return_confidence=True
     """
-    image = load_img(image_path, target_size=(img_height, img_width))
-    image = img_to_array(image)
-    image = np.expand_dims(image, axis=0)
-    image = preprocess_input(image)
-    prediction = model.predict(image)[0]
+    # Same decode and bilinear resize as training and classify_batch
+    _, image = _load_for_inference(image_path)
+    image = np.expand_dims(image.numpy(), axis=0)
+    prediction = _predict(image.astype(np.float32))[0]
     
-    classes = train_generator.class_indices
-    inv_classes = {v: k for k, v in classes.items()}
     pred_idx = np.argmax(prediction)
-    pred_class = inv_classes[pred_idx]
+    pred_class = class_names[pred_idx]
     confidence = float(prediction[pred_idx])
     
     if return_confidence:
         return pred_class, confidence
     return pred_class
 
+def _load_for_inference(path):
+    """Read and preprocess one image the way the training pipeline does"""
+    image = tf.io.decode_image(tf.io.read_file(path), channels=3, expand_animations=False)
+    image = tf.image.resize(image, (img_height, img_width))
+    return path, preprocess_input(image)
+
 def classify_batch(image_paths):
     """
     Classify multiple screenshots in batch.
@@ -196,38 +346,32 @@ def classify_batch(image_paths):
     Returns:
         List of (filename, class, confidence) tuples
     """
-    batch = []
-    for path in image_paths:
-        try:
-            img = load_img(path, target_size=(img_height, img_width))
-            img = img_to_array(img)
-            batch.append(img)
-        except Exception as e:
-            print(f"Error loading {path}: {str(e)}")
-            continue
-            
-    if not batch:
+    if not image_paths:
         return []
         
-    batch = np.array(batch)
-    batch = preprocess_input(batch)
-    predictions = model.predict(batch)
+    # Decode, resize and preprocess in parallel inside the tf.data runtime;
+    # unreadable images are dropped and their paths reported below
+    ds = (
+        tf.data.Dataset.from_tensor_slices([str(path) for path in image_paths])
+        .map(_load_for_inference, num_parallel_calls=AUTOTUNE)
+        .apply(tf.data.experimental.ignore_errors())
+        .batch(inference_batch_size)
+        .prefetch(AUTOTUNE)
+    )
     
-    classes = train_generator.class_indices
-    inv_classes = {v: k for k, v in classes.items()}
     results = []
-    
-    for i, path in enumerate(image_paths):
-        if i >= len(predictions):
-            break
-        pred = predictions[i]
-        pred_idx = np.argmax(pred)
-        results.append((
-            os.path.basename(path),
-            inv_classes[pred_idx],
-            float(pred[pred_idx])
-        ))
-    
+    loaded = set()
+    for paths, images in ds:
+        predictions = _predict(images.numpy())
+        pred_indices = predictions.argmax(axis=1)
+        for path, pred, pred_idx in zip(paths.numpy(), predictions, pred_indices):
+            path = path.decode()
+            loaded.add(path)
+            results.append((os.path.basename(path), class_names[pred_idx], float(pred[pred_idx])))
+            
+    for path in image_paths:
+        if str(path) not in loaded:
+            print(f"Error loading {path}")
     return results
 
 # ------- Example Usage -------
@@ -12,8 +12,8 @@ import os
 import sys
 from datetime import datetime
 from screenshot_classifier import (
-    train_generator,
-    val_generator,
+    train_ds,
+    val_ds,
     model,
     evaluate_model
 )
@@ -56,10 +56,8 @@ def train_model():
 
     # Train
     history = model.fit(
-        train_generator,
-        steps_per_epoch=train_generator.samples // train_generator.batch_size,
-        validation_data=val_generator,
-        validation_steps=val_generator.samples // val_generator.batch_size,
+        train_ds,
+        validation_data=val_ds,
         epochs=50,
         callbacks=callbacks
     )
@@ -70,7 +68,7 @@ def evaluate_and_save():
     """Evaluate model and save reports"""
     # Evaluate
     print("\nEvaluating model...")
-    evaluate_model(model, val_generator)
+    evaluate_model(model, val_ds)
 
     # Save final model
     model.save(os.path.join(MODEL_DIR, 'production_model.keras'))
@@ -1,8 +1,16 @@
 from prometheus_client import start_http_server
+import json
 import logging
+from functools import lru_cache
 from pathlib import Path
 import yaml
 
+# libyaml's C loader and dumper when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -10,6 +18,40 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def _write_json_cache(cache_path: Path, config) -> None:
+    """Save parsed configuration as JSON for faster loads on later starts."""
+    try:
+        serialized = json.dumps(config)
+        # Only cache configs JSON reproduces exactly (no dates, non-string keys)
+        if json.loads(serialized) != config:
+            return
+        cache_path.write_text(serialized)
+    except (TypeError, ValueError, OSError) as e:
+        logger.debug(f"Not caching monitoring configuration: {str(e)}")
+
+@lru_cache(maxsize=32)
+def _load_yaml_config(path: str, mtime_ns: int) -> dict:
+    """Parse a YAML config file once per process for each version of the file.
+
+    Keyed on the file's mtime_ns, so an edited file is reparsed.
+    """
+    config_path = Path(path)
+    
+    # Parsed copy of the YAML, reused while it is newer than the YAML
+    cache_path = config_path.with_suffix(config_path.suffix + '.cache.json')
+    if cache_path.exists() and cache_path.stat().st_mtime_ns >= mtime_ns:
+        with open(cache_path, 'r') as f:
+            config = json.load(f)
+        logger.info(f"Loaded monitoring configuration from {cache_path}")
+        return config
+    
+    with open(config_path, 'r') as f:
+        config = yaml.load(f, Loader=_YamlLoader)
+    
+    _write_json_cache(cache_path, config)
+    logger.info(f"Loaded monitoring configuration from {config_path}")
+    return config
+
 class MonitoringConfig:
     def __init__(self, config_path: str = "monitoring_config.yaml"):
         self.config_path = Path(config_path)
@@ -46,17 +88,14 @@ class MonitoringConfig:
                 
                 # Save default configuration
                 with open(self.config_path, 'w') as f:
-                    yaml.dump(default_config, f, default_flow_style=False)
+                    yaml.dump(default_config, f, Dumper=_YamlDumper, default_flow_style=False)
                 
                 logger.info(f"Created default monitoring configuration at {self.config_path}")
                 return default_config
             
-            # Load existing configuration
-            with open(self.config_path, 'r') as f:
-                config = yaml.safe_load(f)
-            
-            logger.info(f"Loaded monitoring configuration from {self.config_path}")
-            return config
+            # Load existing configuration; shared by every instance reading
+            # this version of the file, so it is treated as read-only
+            return _load_yaml_config(str(self.config_path), self.config_path.stat().st_mtime_ns)
             
         except Exception as e:
             logger.error(f"Error loading monitoring configuration: {str(e)}")
@@ -1,9 +1,9 @@
 import json
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 import numpy as np
-from sklearn.ensemble import IsolationForest
-from sklearn.preprocessing import StandardScaler
 import logging
 from dataclasses import dataclass, asdict
 
@@ -14,7 +14,8 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-@dataclass
+# Slotted: alert_history can hold a very large number of these
+@dataclass(slots=True)
 class Alert:
     type: str
     severity: str
@@ -22,12 +23,32 @@ class Alert:
     timestamp: str
     metadata: Dict[str, Any]
 
+# Model inputs, in column order, and the score below which a sample is anomalous
+ERGONOMIC_FEATURES = ('posture_score', 'attention_level', 'activity_level')
+STRESS_FEATURES = ('keyboard_events', 'mouse_clicks', 'inactivity_duration')
+ANOMALY_SCORE_THRESHOLD = -0.5  # Adjust threshold as needed
+
 class PredictiveAnalytics:
     def __init__(self):
+        # sklearn is slow to import; keep it off the path of modules that
+        # only need Alert
+        from sklearn.ensemble import IsolationForest
+        from sklearn.preprocessing import StandardScaler
+        
         self.ergonomic_model = IsolationForest(contamination=0.1)
         self.stress_model = IsolationForest(contamination=0.1)
         self.scaler = StandardScaler()
         self.alert_history: List[Alert] = []
+        # Query indexes over alert_history, kept in step by _record_alerts:
+        # epoch seconds per alert, and positions of each alert type
+        self._ts_epochs: List[float] = []
+        self._by_type: Dict[str, List[int]] = defaultdict(list)
+        self._ts_sorted = True
+        # Alerts already written by export_alerts
+        self._exported_count = 0
+        # Fitted scaler statistics, applied directly in _detect_anomalies
+        self._scaler_mean: Optional[np.ndarray] = None
+        self._scaler_scale: Optional[np.ndarray] = None
         
         # Thresholds for different metrics
         self.thresholds = {
@@ -54,86 +75,81 @@ class PredictiveAnalytics:
             scaled_data = self.scaler.fit_transform(baseline_data)
             self.ergonomic_model.fit(scaled_data)
             self.stress_model.fit(scaled_data)
+            self._scaler_mean = self.scaler.mean_.astype(np.float64)
+            self._scaler_scale = self.scaler.scale_.astype(np.float64)
             
             logger.info("Models initialized successfully")
         except Exception as e:
             logger.error(f"Error initializing models: {str(e)}")
     
-    def analyze_ergonomics(self, data: Dict[str, Any]) -> Optional[Alert]:
-        """Analyze ergonomic data and generate alerts if needed."""
+    def _detect_anomalies(self, model, feature_names, data_list: List[Dict[str, Any]],
+                          alert_type: str, message: str) -> List[Optional[Alert]]:
+        """Score every sample with one model call; returns an alert or None per sample."""
+        # Extract relevant features, one row per sample
+        features = np.array([[data.get(name, 0) for name in feature_names] for data in data_list])
+        
+        # Scale features with the fitted statistics directly; transform()'s
+        # input validation costs more than the arithmetic on a few rows
+        if self._scaler_mean is None:
+            scaled = self.scaler.transform(features)  # Raises: scaler not fitted
+        else:
+            scaled = features.astype(np.float64)
+            np.subtract(scaled, self._scaler_mean, out=scaled)
+            np.divide(scaled, self._scaler_scale, out=scaled)
+        
+        # Predict anomaly scores
+        scores = model.score_samples(scaled)
+        
+        # Generate alerts for samples scoring below threshold, all stamped
+        # with the batch's time
+        alerts: List[Optional[Alert]] = [None] * len(data_list)
+        anomalies = np.flatnonzero(scores < ANOMALY_SCORE_THRESHOLD)
+        now_iso = datetime.now().isoformat() if anomalies.size else None
+        for i in anomalies:
+            alerts[i] = Alert(
+                type=alert_type,
+                severity="warning",
+                message=message,
+                timestamp=now_iso,
+                metadata={
+                    'anomaly_score': float(scores[i]),
+                    'features': features[i].tolist()
+                }
+            )
+        self._record_alerts([alert for alert in alerts if alert is not None])
+        return alerts
+    
+    def analyze_ergonomics_batch(self, data_list: List[Dict[str, Any]]) -> List[Optional[Alert]]:
+        """Analyze many ergonomic samples at once; returns an alert or None per sample."""
         try:
-            # Extract relevant features
-            features = np.array([
-                data.get('posture_score', 0),
-                data.get('attention_level', 0),
-                data.get('activity_level', 0)
-            ]).reshape(1, -1)
-            
-            # Scale features
-            scaled_features = self.scaler.transform(features)
-            
-            # Predict anomaly score
-            anomaly_score = self.ergonomic_model.score_samples(scaled_features)[0]
-            
-            # Generate alert if anomaly score is below threshold
-            if anomaly_score < -0.5:  # Adjust threshold as needed
-                alert = Alert(
-                    type="ergonomic",
-                    severity="warning",
-                    message="Poor ergonomic conditions detected",
-                    timestamp=datetime.now().isoformat(),
-                    metadata={
-                        'anomaly_score': float(anomaly_score),
-                        'features': features.tolist()[0]
-                    }
-                )
-                self.alert_history.append(alert)
-                return alert
-            
-            return None
+            return self._detect_anomalies(self.ergonomic_model, ERGONOMIC_FEATURES, data_list,
+                                          "ergonomic", "Poor ergonomic conditions detected")
         except Exception as e:
             logger.error(f"Error analyzing ergonomics: {str(e)}")
-            return None
+            return [None] * len(data_list)
     
-    def analyze_stress(self, data: Dict[str, Any]) -> Optional[Alert]:
-        """Analyze stress indicators and generate alerts if needed."""
+    def analyze_stress_batch(self, data_list: List[Dict[str, Any]]) -> List[Optional[Alert]]:
+        """Analyze many stress samples at once; returns an alert or None per sample."""
         try:
-            # Extract relevant features
-            features = np.array([
-                data.get('keyboard_events', 0),
-                data.get('mouse_clicks', 0),
-                data.get('inactivity_duration', 0)
-            ]).reshape(1, -1)
-            
-            # Scale features
-            scaled_features = self.scaler.transform(features)
-            
-            # Predict anomaly score
-            anomaly_score = self.stress_model.score_samples(scaled_features)[0]
-            
-            # Generate alert if anomaly score is below threshold
-            if anomaly_score < -0.5:  # Adjust threshold as needed
-                alert = Alert(
-                    type="stress",
-                    severity="warning",
-                    message="Potential stress indicators detected",
-                    timestamp=datetime.now().isoformat(),
-                    metadata={
-                        'anomaly_score': float(anomaly_score),
-                        'features': features.tolist()[0]
-                    }
-                )
-                self.alert_history.append(alert)
-                return alert
-            
-            return None
+            return self._detect_anomalies(self.stress_model, STRESS_FEATURES, data_list,
+                                          "stress", "Potential stress indicators detected")
         except Exception as e:
             logger.error(f"Error analyzing stress: {str(e)}")
-            return None
+            return [None] * len(data_list)
+    
+    def analyze_ergonomics(self, data: Dict[str, Any]) -> Optional[Alert]:
+        """Analyze ergonomic data and generate alerts if needed."""
+        return self.analyze_ergonomics_batch([data])[0]
+    
+    def analyze_stress(self, data: Dict[str, Any]) -> Optional[Alert]:
+        """Analyze stress indicators and generate alerts if needed."""
+        return self.analyze_stress_batch([data])[0]
     
     def check_thresholds(self, data: Dict[str, Any]) -> List[Alert]:
         """Check if any metrics exceed predefined thresholds."""
         alerts = []
+        # One clock read for every alert this check raises
+        now_iso = datetime.now().isoformat()
         
         try:
             # Check posture score
@@ -142,7 +158,7 @@ class PredictiveAnalytics:
                     type="posture",
                     severity="warning",
                     message="Poor posture detected",
-                    timestamp=datetime.now().isoformat(),
+                    timestamp=now_iso,
                     metadata={'current_score': data.get('posture_score')}
                 ))
             
@@ -152,7 +168,7 @@ class PredictiveAnalytics:
                     type="attention",
                     severity="info",
                     message="Low attention level detected",
-                    timestamp=datetime.now().isoformat(),
+                    timestamp=now_iso,
                     metadata={'current_level': data.get('attention_level')}
                 ))
             
@@ -162,46 +178,75 @@ class PredictiveAnalytics:
                     type="inactivity",
                     severity="warning",
                     message="Prolonged inactivity detected",
-                    timestamp=datetime.now().isoformat(),
+                    timestamp=now_iso,
                     metadata={'duration_seconds': data.get('inactivity_duration')}
                 ))
             
             # Add alerts to history
-            self.alert_history.extend(alerts)
+            self._record_alerts(alerts)
             
             return alerts
         except Exception as e:
             logger.error(f"Error checking thresholds: {str(e)}")
             return []
     
+    def _record_alerts(self, alerts: List[Alert]):
+        """Append alerts to the history and its query indexes."""
+        last_timestamp = last_epoch = None
+        for alert in alerts:
+            # Alerts from one batch share a timestamp; parse it once
+            if alert.timestamp != last_timestamp:
+                last_timestamp = alert.timestamp
+                last_epoch = datetime.fromisoformat(alert.timestamp).timestamp()
+            epoch = last_epoch
+            if self._ts_epochs and epoch < self._ts_epochs[-1]:
+                # e.g. the clock stepped back; range queries fall back to a scan
+                self._ts_sorted = False
+            self._by_type[alert.type].append(len(self.alert_history))
+            self._ts_epochs.append(epoch)
+            self.alert_history.append(alert)
+    
     def get_alert_history(self, 
                          alert_type: Optional[str] = None,
                          start_time: Optional[str] = None,
                          end_time: Optional[str] = None) -> List[Alert]:
         """Retrieve alert history with optional filtering."""
-        filtered_alerts = self.alert_history.copy()
+        start_epoch = datetime.fromisoformat(start_time).timestamp() if start_time else None
+        end_epoch = datetime.fromisoformat(end_time).timestamp() if end_time else None
         
-        if alert_type:
-            filtered_alerts = [a for a in filtered_alerts if a.type == alert_type]
+        if not self._ts_sorted:
+            return [
+                a for a, epoch in zip(self.alert_history, self._ts_epochs)
+                if (not alert_type or a.type == alert_type)
+                and (start_epoch is None or epoch >= start_epoch)
+                and (end_epoch is None or epoch <= end_epoch)
+            ]
         
-        if start_time:
-            start_dt = datetime.fromisoformat(start_time)
-            filtered_alerts = [a for a in filtered_alerts 
-                             if datetime.fromisoformat(a.timestamp) >= start_dt]
+        # Positions [lo, hi) of alerts inside the time range
+        lo = bisect_left(self._ts_epochs, start_epoch) if start_epoch is not None else 0
+        hi = bisect_right(self._ts_epochs, end_epoch) if end_epoch is not None else len(self._ts_epochs)
         
-        if end_time:
-            end_dt = datetime.fromisoformat(end_time)
-            filtered_alerts = [a for a in filtered_alerts 
-                             if datetime.fromisoformat(a.timestamp) <= end_dt]
+        if not alert_type:
+            return self.alert_history[lo:hi]
         
-        return filtered_alerts
+        # Positions per type are ascending, so the range is another bisect
+        positions = self._by_type.get(alert_type, [])
+        first, last = bisect_left(positions, lo), bisect_left(positions, hi)
+        return [self.alert_history[i] for i in positions[first:last]]
     
     def export_alerts(self, filename: str):
-        """Export alert history to a JSON file."""
+        """Append alerts raised since the last export to a JSON Lines file.
+        
+        One JSON object per line; earlier exports are left in place.
+        """
         try:
-            with open(filename, 'w') as f:
-                json.dump([asdict(alert) for alert in self.alert_history], f, indent=2)
-            logger.info(f"Exported alerts to {filename}")
+            new_alerts = self.alert_history[self._exported_count:]
+            with open(filename, 'a') as f:
+                for alert in new_alerts:
+                    f.write(json.dumps(asdict(alert), separators=(',', ':')))
+                    f.write('\n')
+            self._exported_count += len(new_alerts)
+            logger.info(f"Exported {len(new_alerts)} alerts to {filename}")
             return True
         except Exception as e:
             logger.error(f"Error exporting alerts: {str(e)}")
@@ -227,4 +272,4 @@ if __name__ == "__main__":
     threshold_alerts = analytics.check_thresholds(sample_data)
     
     # Export alerts
-    analytics.export_alerts("alerts.json") 
\ No newline at end of file
+    analytics.export_alerts("alerts.jsonl") 
\ No newline at end of file
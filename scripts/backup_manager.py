@@ -1,9 +1,13 @@
 import os
-import boto3
+import base64
 import logging
 from datetime import datetime, timedelta
+from functools import cached_property
 import subprocess
 import hashlib
+import tarfile
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 import json
 from pathlib import Path
 
@@ -18,9 +22,19 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Size of each S3 multipart chunk (S3's minimum for all but the last part is 5 MiB)
+UPLOAD_PART_SIZE = 8 * 1024 * 1024
+
+# Concurrent head_object requests during rotation; each is a network round trip
+HEAD_WORKERS = 32
+# delete_objects accepts at most 1000 keys per request
+DELETE_BATCH_SIZE = 1000
+
+# Parallel pg_dump/pg_restore workers; each opens its own database connection
+PG_JOBS = int(os.getenv('PG_DUMP_JOBS', os.cpu_count() or 1))
+
 class BackupManager:
     def __init__(self):
-        self.s3_client = boto3.client('s3')
         self.bucket_name = os.getenv('BACKUP_BUCKET_NAME', 'hr-analytics-backups')
         self.backup_dir = Path('/backups')
         self.retention_days = {
@@ -28,74 +42,169 @@ class BackupManager:
             'weekly': 30,
             'monthly': 365
         }
+    
+    @cached_property
+    def s3_client(self):
+        """S3 client, created on first use so importing boto3 stays off startup"""
+        import boto3
+        from botocore.config import Config
+        
+        # Enough pooled connections for rotate_backups' concurrent requests
+        return boto3.client('s3', config=Config(max_pool_connections=HEAD_WORKERS))
         
     def create_backup(self):
         """Create a new database backup"""
         try:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-            backup_file = self.backup_dir / f'backup_{timestamp}.dump'
-            
-            # Create backup
-            cmd = [
-                'pg_dump',
-                '-U', 'postgres',
-                '-d', 'app',
-                '-F', 'c',
-                '-f', str(backup_file)
-            ]
-            
-            logger.info(f"Creating backup: {backup_file}")
-            subprocess.run(cmd, check=True)
+            backup_type = self._determine_backup_type()
+            # The type prefix lets rotation work from the listing alone
+            backup_key = f'{backup_type}/backup_{timestamp}.tar'
             
-            # Calculate checksum
-            checksum = self._calculate_checksum(backup_file)
-            
-            # Upload to S3
-            self._upload_to_s3(backup_file, checksum)
-            
-            # Clean up local file
-            backup_file.unlink()
+            logger.info(f"Creating backup: {backup_key}")
+            with tempfile.TemporaryDirectory(dir=self.backup_dir) as work_dir:
+                # Directory format is the one pg_dump can write with parallel jobs
+                dump_dir = Path(work_dir) / 'dump'
+                self._run_logged([
+                    'pg_dump',
+                    '-U', 'postgres',
+                    '-d', 'app',
+                    '-F', 'd',
+                    '-j', str(PG_JOBS),
+                    '-v',
+                    '-f', str(dump_dir)
+                ])
+                
+                # Upload the directory as one tar stream; its table files are
+                # already compressed by pg_dump
+                proc = subprocess.Popen(['tar', '-cf', '-', '-C', str(dump_dir), '.'], stdout=subprocess.PIPE)
+                try:
+                    self._stream_to_s3(proc, backup_key, backup_type)
+                finally:
+                    proc.stdout.close()
+                    proc.wait()
             
-            logger.info(f"Backup completed successfully: {backup_file.name}")
+            logger.info(f"Backup completed successfully: {backup_key}")
             return True
             
         except Exception as e:
             logger.error(f"Backup failed: {str(e)}")
             return False
             
-    def _calculate_checksum(self, file_path):
-        """Calculate SHA-256 checksum of a file"""
-        sha256_hash = hashlib.sha256()
-        with open(file_path, "rb") as f:
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+    def _run_logged(self, cmd):
+        """Run a command, logging its stderr (pg_dump's -v progress) as it arrives"""
+        proc = subprocess.Popen(cmd, stderr=subprocess.PIPE, text=True)
+        for line in proc.stderr:
+            logger.info(f"{cmd[0]}: {line.rstrip()}")
+        if proc.wait() != 0:
+            raise subprocess.CalledProcessError(proc.returncode, cmd)
+            
+    def _stream_to_s3(self, proc, key, backup_type):
+        """Upload a process's stdout to S3 as a multipart upload.
+
+        S3 computes and verifies a SHA-256 of every part as it arrives, so
+        the data isn't hashed locally as well.
+        """
+        upload_id = self.s3_client.create_multipart_upload(
+            Bucket=self.bucket_name,
+            Key=key,
+            Metadata={
+                'backup_type': backup_type,
+                'timestamp': datetime.now().isoformat(),
+                # Needed to recompute S3's per-part checksum when verifying
+                'part_size': str(UPLOAD_PART_SIZE)
+            },
+            ServerSideEncryption='AES256',
+            ChecksumAlgorithm='SHA256'
+        )['UploadId']
         
-    def _upload_to_s3(self, file_path, checksum):
-        """Upload file to S3 with metadata"""
         try:
-            metadata = {
-                'checksum': checksum,
-                'backup_type': self._determine_backup_type(),
-                'timestamp': datetime.now().isoformat()
-            }
-            
-            self.s3_client.upload_file(
-                str(file_path),
-                self.bucket_name,
-                file_path.name,
-                ExtraArgs={
-                    'Metadata': metadata,
-                    'ServerSideEncryption': 'AES256'
-                }
-            )
+            parts = []
+            while True:
+                chunk = proc.stdout.read(UPLOAD_PART_SIZE)
+                if not chunk:
+                    break
+                part = self.s3_client.upload_part(
+                    Bucket=self.bucket_name,
+                    Key=key,
+                    UploadId=upload_id,
+                    PartNumber=len(parts) + 1,
+                    Body=chunk,
+                    ChecksumAlgorithm='SHA256'
+                )
+                parts.append({
+                    'PartNumber': len(parts) + 1,
+                    'ETag': part['ETag'],
+                    'ChecksumSHA256': part['ChecksumSHA256']
+                })
             
-            logger.info(f"Uploaded to S3: {file_path.name}")
+            # Don't publish a truncated backup
+            if proc.wait() != 0:
+                raise subprocess.CalledProcessError(proc.returncode, proc.args)
+            if not parts:
+                raise ValueError(f"{proc.args[0]} produced no output")
             
-        except Exception as e:
-            logger.error(f"S3 upload failed: {str(e)}")
+            self.s3_client.complete_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id,
+                MultipartUpload={'Parts': parts}
+            )
+        except Exception:
+            self.s3_client.abort_multipart_upload(
+                Bucket=self.bucket_name,
+                Key=key,
+                UploadId=upload_id
+            )
             raise
+        
+        logger.info(f"Uploaded to S3: {key}")
+        
+    def _verify_download(self, key, local_path):
+        """Check a downloaded backup against the checksum S3 holds for it"""
+        head = self.s3_client.head_object(
+            Bucket=self.bucket_name,
+            Key=key,
+            ChecksumMode='ENABLED'
+        )
+        metadata = head['Metadata']
+        
+        native_checksum = head.get('ChecksumSHA256')
+        if native_checksum and 'part_size' in metadata:
+            return self._multipart_checksum(local_path, int(metadata['part_size'])) == native_checksum
+        
+        # Older backups carry a hex SHA-256 of the whole file in a tag or metadata
+        stored_checksum = metadata.get('checksum')
+        tags = self.s3_client.get_object_tagging(
+            Bucket=self.bucket_name,
+            Key=key
+        )['TagSet']
+        for tag in tags:
+            if tag['Key'] == 'checksum':
+                stored_checksum = tag['Value']
+        return self._calculate_checksum(local_path) == stored_checksum
+        
+    def _multipart_checksum(self, file_path, part_size):
+        """S3's SHA-256 for a multipart object: a hash of the part hashes, suffixed with the part count"""
+        part_digests = []
+        with open(file_path, "rb") as f:
+            while chunk := f.read(part_size):
+                part_digests.append(hashlib.sha256(chunk).digest())
+        combined = base64.b64encode(hashlib.sha256(b"".join(part_digests)).digest()).decode()
+        return f"{combined}-{len(part_digests)}"
+        
+    def _calculate_checksum(self, file_path):
+        """Calculate SHA-256 checksum of a file"""
+        with open(file_path, "rb") as f:
+            if hasattr(hashlib, 'file_digest'):  # Python 3.11+
+                return hashlib.file_digest(f, 'sha256').hexdigest()
             
+            # 1 MiB reads into one reused buffer instead of a new 4 KB bytes per read
+            sha256_hash = hashlib.sha256()
+            buffer = memoryview(bytearray(1024 * 1024))
+            while n := f.readinto(buffer):
+                sha256_hash.update(buffer[:n])
+            return sha256_hash.hexdigest()
+        
     def _determine_backup_type(self):
         """Determine if this is a daily, weekly, or monthly backup"""
         now = datetime.now()
@@ -105,24 +214,38 @@ class BackupManager:
             return 'weekly'
         return 'daily'
         
+    def _list_backups(self):
+        """All objects in the backup bucket, across every page of results"""
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name):
+            yield from page.get('Contents', [])
+            
     def rotate_backups(self):
         """Rotate backups based on retention policy"""
         try:
-            # List all backups in S3
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name
-            )
-            
-            if 'Contents' not in response:
-                return
-                
-            for obj in response['Contents']:
-                metadata = self.s3_client.head_object(
+            # List all backups in S3; the type comes from the key prefix
+            typed, untyped = [], []
+            for obj in self._list_backups():
+                prefix = obj['Key'].split('/', 1)[0]
+                if prefix in self.retention_days:
+                    typed.append((obj, prefix))
+                else:
+                    untyped.append(obj)
+                    
+            # Backups from before type prefixes only record it in metadata
+            def fetch_backup_type(obj):
+                return self.s3_client.head_object(
                     Bucket=self.bucket_name,
                     Key=obj['Key']
-                )['Metadata']
+                )['Metadata'].get('backup_type', 'daily')
                 
-                backup_type = metadata.get('backup_type', 'daily')
+            if untyped:
+                # boto3 clients are thread-safe, so the HEAD round trips overlap
+                with ThreadPoolExecutor(max_workers=HEAD_WORKERS) as executor:
+                    typed.extend(zip(untyped, executor.map(fetch_backup_type, untyped)))
+                
+            expired = []
+            for obj, backup_type in typed:
                 retention_days = self.retention_days[backup_type]
                 
                 last_modified = obj['LastModified']
@@ -130,10 +253,15 @@ class BackupManager:
                 
                 if age > retention_days:
                     logger.info(f"Deleting old backup: {obj['Key']} (age: {age} days)")
-                    self.s3_client.delete_object(
-                        Bucket=self.bucket_name,
-                        Key=obj['Key']
-                    )
+                    expired.append({'Key': obj['Key']})
+                    
+            for i in range(0, len(expired), DELETE_BATCH_SIZE):
+                response = self.s3_client.delete_objects(
+                    Bucket=self.bucket_name,
+                    Delete={'Objects': expired[i:i + DELETE_BATCH_SIZE], 'Quiet': True}
+                )
+                for error in response.get('Errors', []):
+                    logger.error(f"Failed to delete {error['Key']}: {error.get('Message')}")
                     
         except Exception as e:
             logger.error(f"Backup rotation failed: {str(e)}")
@@ -141,34 +269,22 @@ class BackupManager:
     def verify_backups(self):
         """Verify the integrity of recent backups"""
         try:
-            # Get the most recent backup
-            response = self.s3_client.list_objects_v2(
-                Bucket=self.bucket_name,
-                MaxKeys=1
-            )
+            # Get the most recent backup; listings are sorted by key, not age
+            latest_backup = max(self._list_backups(), key=lambda obj: obj['LastModified'], default=None)
             
-            if 'Contents' not in response:
+            if latest_backup is None:
                 logger.warning("No backups found to verify")
                 return
-                
-            latest_backup = response['Contents'][0]
-            metadata = self.s3_client.head_object(
-                Bucket=self.bucket_name,
-                Key=latest_backup['Key']
-            )['Metadata']
             
             # Download and verify checksum
-            local_path = self.backup_dir / latest_backup['Key']
+            local_path = self.backup_dir / Path(latest_backup['Key']).name
             self.s3_client.download_file(
                 self.bucket_name,
                 latest_backup['Key'],
                 str(local_path)
             )
             
-            calculated_checksum = self._calculate_checksum(local_path)
-            stored_checksum = metadata.get('checksum')
-            
-            if calculated_checksum == stored_checksum:
+            if self._verify_download(latest_backup['Key'], local_path):
                 logger.info(f"Backup verification successful: {latest_backup['Key']}")
             else:
                 logger.error(f"Backup verification failed: {latest_backup['Key']}")
@@ -183,7 +299,7 @@ class BackupManager:
         """Restore a specific backup"""
         try:
             # Download backup
-            local_path = self.backup_dir / backup_key
+            local_path = self.backup_dir / Path(backup_key).name
             self.s3_client.download_file(
                 self.bucket_name,
                 backup_key,
@@ -191,26 +307,36 @@ class BackupManager:
             )
             
             # Verify checksum
-            metadata = self.s3_client.head_object(
-                Bucket=self.bucket_name,
-                Key=backup_key
-            )['Metadata']
-            
-            calculated_checksum = self._calculate_checksum(local_path)
-            if calculated_checksum != metadata.get('checksum'):
+            if not self._verify_download(backup_key, local_path):
                 raise ValueError("Backup integrity check failed")
                 
             # Restore database
-            cmd = [
-                'pg_restore',
-                '-U', 'postgres',
-                '-d', 'app',
-                '-F', 'c',
-                str(local_path)
-            ]
-            
             logger.info(f"Restoring backup: {backup_key}")
-            subprocess.run(cmd, check=True)
+            if backup_key.endswith('.tar'):
+                with tempfile.TemporaryDirectory(dir=self.backup_dir) as dump_dir:
+                    with tarfile.open(local_path) as tar:
+                        if hasattr(tarfile, 'data_filter'):
+                            tar.extractall(dump_dir, filter='data')
+                        else:
+                            tar.extractall(dump_dir)
+                    self._run_logged([
+                        'pg_restore',
+                        '-U', 'postgres',
+                        '-d', 'app',
+                        '-F', 'd',
+                        '-j', str(PG_JOBS),
+                        dump_dir
+                    ])
+            else:
+                # Custom-format dumps from before directory-format backups
+                self._run_logged([
+                    'pg_restore',
+                    '-U', 'postgres',
+                    '-d', 'app',
+                    '-F', 'c',
+                    '-j', str(PG_JOBS),
+                    str(local_path)
+                ])
             
             # Clean up
             local_path.unlink()
@@ -19,7 +19,8 @@ class TutorialGenerator:
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{timestamp}_{title.lower().replace(' ', '_')}.md"
         
-        content = f"""# {title}
+        # Collect the sections and join once at the end
+        parts = [f"""# {title}
 
 ## Overview
 {description}
@@ -30,7 +31,7 @@ class TutorialGenerator:
 - Last Updated: {datetime.now().strftime("%Y-%m-%d")}
 
 ## Timestamps
-"""
+"""]
         
         # Calculate timestamps based on duration and number of steps
         total_seconds = duration_minutes * 60
@@ -40,17 +41,17 @@ class TutorialGenerator:
             timestamp_seconds = int(i * step_duration)
             minutes = timestamp_seconds // 60
             seconds = timestamp_seconds % 60
-            content += f"\n{minutes:02d}:{seconds:02d} - {step['title']}\n"
-            content += f"{step['description']}\n"
+            parts.append(f"\n{minutes:02d}:{seconds:02d} - {step['title']}\n")
+            parts.append(f"{step['description']}\n")
             
             if 'code' in step:
-                content += f"\n```python\n{step['code']}\n```\n"
+                parts.append(f"\n```python\n{step['code']}\n```\n")
             
             if 'notes' in step:
-                content += f"\n> Note: {step['notes']}\n"
+                parts.append(f"\n> Note: {step['notes']}\n")
 
         # Add resources section
-        content += """
+        parts.append("""
 ## Resources
 - [Documentation](docs/user_guide.md)
 - [API Reference](docs/api_docs.md)
@@ -60,7 +61,8 @@ class TutorialGenerator:
 1. Practice the demonstrated features
 2. Explore related documentation
 3. Join our community forum for questions
-"""
+""")
+        content = "".join(parts)
 
         # Save the tutorial script
         with open(self.tutorials_dir / filename, 'w') as f:
@@ -81,18 +83,12 @@ class TutorialGenerator:
             "file": tutorial_data["filename"]
         }
         
-        # Update metadata file
-        metadata_file = self.tutorials_dir / "metadata.json"
-        if metadata_file.exists():
-            with open(metadata_file, 'r') as f:
-                existing_metadata = json.load(f)
-        else:
-            existing_metadata = []
-        
-        existing_metadata.append(metadata)
-        
-        with open(metadata_file, 'w') as f:
-            json.dump(existing_metadata, f, indent=2)
+        # Append to the metadata index, one JSON object per line, so adding a
+        # tutorial never rewrites the existing entries
+        metadata_file = self.tutorials_dir / "metadata.jsonl"
+        with open(metadata_file, 'a') as f:
+            f.write(json.dumps(metadata, separators=(',', ':')))
+            f.write('\n')
 
 def main():
     # Example tutorial data
@@ -20,12 +20,12 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 class WebcamIntegration:
-    def __init__(self, config_path='config.json'):
+    def __init__(self, config_path='config.json', config=None):
         self.camera = None
         self.is_recording = False
         self.recording_thread = None
         self.analysis_thread = None
-        self.config = self._load_config(config_path)
+        self.config = self._load_config(config_path, config)
         self.pose_analyzer = mp_pose.Pose(
             min_detection_confidence=0.5,
             min_tracking_confidence=0.5
@@ -36,7 +36,7 @@ class WebcamIntegration:
         self.data_buffer = []
         self.last_save_time = time.time()
         
-    def _load_config(self, config_path):
+    def _load_config(self, config_path, config=None):
         default_config = {
             'recording_interval': 5,  # seconds
             'snapshot_interval': 30,  # seconds
@@ -47,6 +47,10 @@ class WebcamIntegration:
             'face_detection_interval': 1  # seconds
         }
         
+        # An already-parsed config skips reading config_path again
+        if config is not None:
+            return {**default_config, **config}
+            
         try:
             with open(config_path, 'r') as f:
                 config = json.load(f)